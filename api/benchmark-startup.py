@@ -0,0 +1,91 @@
+"""
+Benchmark de cold start: mede, em processos Python novos, o tempo de importar
+a API e responder a primeira requisição de /api/health.
+
+    python api/benchmark-startup.py            # alvo padrão de 1500 ms
+    COLD_START_TARGET_MS=800 python api/benchmark-startup.py
+
+Sai com código 1 se a mediana passar do alvo ou se pandas/numpy forem
+carregados para responder o health check.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+TARGET_MS = float(os.getenv("COLD_START_TARGET_MS", "1500"))
+RUNS = int(os.getenv("COLD_START_RUNS", "5"))
+
+# Executado em um processo novo a cada rodada (simula o cold start da Vercel)
+PROBE = r"""
+import asyncio, json, sys, time
+
+start = time.perf_counter()
+import index
+import_ms = (time.perf_counter() - start) * 1000
+
+async def health():
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/health", "raw_path": b"/api/health",
+        "query_string": b"", "root_path": "", "headers": [], "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        # Corpo entregue uma vez; depois o cliente "desconecta", como num servidor ASGI real
+        return requests.pop() if requests else {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    await index.app(scope, receive, send)
+    return messages[0]["status"]
+
+status = asyncio.run(health())
+total_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({
+    "import_ms": import_ms,
+    "total_ms": total_ms,
+    "status": status,
+    "heavy_modules": [name for name in ("pandas", "numpy", "pymongo") if name in sys.modules],
+}))
+"""
+
+api_dir = Path(__file__).resolve().parent
+
+print("⏱️ Benchmark de cold start - /api/health")
+print("=" * 50)
+
+results = []
+for run in range(RUNS):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=api_dir,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.strip().splitlines()[-1]
+    result = json.loads(output)
+    results.append(result)
+    print(f"Rodada {run + 1}: import {result['import_ms']:.0f} ms, total {result['total_ms']:.0f} ms")
+
+median_ms = statistics.median(r["total_ms"] for r in results)
+heavy = sorted({name for r in results for name in r["heavy_modules"]})
+status_ok = all(r["status"] == 200 for r in results)
+
+print("=" * 50)
+print(f"Mediana: {median_ms:.0f} ms (alvo: {TARGET_MS:.0f} ms)")
+print(f"Módulos pesados carregados: {', '.join(heavy) if heavy else 'nenhum'}")
+
+if status_ok and median_ms <= TARGET_MS and not heavy:
+    print("🎉 Cold start dentro do alvo!")
+else:
+    print("❌ Cold start fora do alvo")
+    sys.exit(1)
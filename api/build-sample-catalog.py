@@ -0,0 +1,27 @@
+"""
+Pré-constrói o catálogo de exemplos: o perfil, os gráficos e o resumo inicial
+da IA ficam em cache em JSON (o CSV em si é sempre relido), para que
+/api/load-sample não precise refazer a análise.
+
+    python api/build-sample-catalog.py
+    SAMPLE_CACHE_DIR=sample_data/.cache python api/build-sample-catalog.py
+
+Executar a partir da raiz do projeto (onde fica sample_data/).
+"""
+
+import asyncio
+
+from index import build_sample_catalog, SAMPLE_CACHE_DIR
+
+print("🏗️ Construindo catálogo de exemplos...")
+print("=" * 50)
+
+catalog = asyncio.run(build_sample_catalog())
+
+for filename, entry in catalog.items():
+    rows, cols = entry["profile"]["basic_info"]["shape"]
+    ai_status = "✅" if entry["initial_analysis"] else "❌ (sem resumo da IA)"
+    print(f"{filename}: {rows} linhas, {cols} colunas, hash {entry['content_hash']} - IA {ai_status}")
+
+print("=" * 50)
+print(f"🎉 {len(catalog)} exemplo(s) em {SAMPLE_CACHE_DIR}")
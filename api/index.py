@@ -1,15 +1,20 @@
 """
 Agente Inteligente para Análise de Dados - EDA Automático
 Versão otimizada para Vercel (sem dependências pesadas de visualização)
+
+Cold start: pandas/numpy são importados sob demanda (dentro das funções que
+usam) e o MongoDB conecta em background no lifespan, então /api/health
+responde sem carregar bibliotecas pesadas nem esperar pelo banco.
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Header
+from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.datastructures import MutableHeaders
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import pandas as pd
-import numpy as np
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
 # Outras bibliotecas úteis
 import io
@@ -17,44 +22,67 @@ import json
 import os
 import uuid
 import asyncio
+import functools
+import gzip
+import hashlib
+import hmac
+import importlib.util
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import Counter
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Banco de dados - MongoDB se estiver disponível
 try:
     from dotenv import load_dotenv
     load_dotenv()
-    
-    # Verificar se deve usar MongoDB
-    USE_MONGODB = os.getenv("USE_MONGODB", "false").lower() == "true"
-    
-    if USE_MONGODB:
-        try:
-            from pymongo import MongoClient
-            from pymongo.errors import ConnectionFailure
-            MONGODB_AVAILABLE = True
-            logger.info("✅ PyMongo disponível - MongoDB habilitado")
-        except ImportError:
-            MONGODB_AVAILABLE = False
-            logger.warning("⚠️ PyMongo não encontrado - usando armazenamento em memória")
+except ImportError:
+    logger.warning("⚠️ python-dotenv não encontrado - usando apenas variáveis do ambiente")
+
+# Verificar se deve usar MongoDB (o import do pymongo fica para a conexão)
+USE_MONGODB = os.getenv("USE_MONGODB", "false").lower() == "true"
+
+if USE_MONGODB:
+    MONGODB_AVAILABLE = importlib.util.find_spec("pymongo") is not None
+    if MONGODB_AVAILABLE:
+        logger.info("✅ PyMongo disponível - MongoDB habilitado")
     else:
-        MONGODB_AVAILABLE = False
-        logger.info("ℹ️ MongoDB desabilitado - usando armazenamento em memória")
-        
-except Exception as e:
+        logger.warning("⚠️ PyMongo não encontrado - usando armazenamento em memória")
+else:
     MONGODB_AVAILABLE = False
-    logger.warning(f"⚠️ Erro ao configurar MongoDB: {e} - usando armazenamento em memória")
+    logger.info("ℹ️ MongoDB desabilitado - usando armazenamento em memória")
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Conecta ao MongoDB em background para não bloquear o cold start"""
+    if MONGODB_AVAILABLE:
+        # Até a conexão terminar as requisições usam o armazenamento em memória
+        app.state.mongodb_task = asyncio.create_task(asyncio.to_thread(init_mongodb))
+    yield
+    if mongo_client is not None:
+        mongo_client.close()
 
 # Criar a aplicação FastAPI
 app = FastAPI(
     title="Analisador Inteligente de Dados CSV",
     description="Faça upload de CSV e converse com seus dados usando IA",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS para o frontend conseguir acessar
@@ -101,30 +129,30 @@ sessions_storage = {}
 
 # Função para inicializar MongoDB
 def init_mongodb():
-    """Inicializa conexão com MongoDB"""
+    """Inicializa conexão com MongoDB (chamada em background pelo lifespan)"""
     global mongo_client, database
     
     if not MONGODB_AVAILABLE:
         return False
     
     try:
+        from pymongo import MongoClient
+        
         logger.info(f"🔌 Conectando ao MongoDB...")
-        mongo_client = MongoClient(
+        client = MongoClient(
             MONGO_URL,
             serverSelectionTimeoutMS=5000,  # Timeout de 5 segundos
             connectTimeoutMS=10000
         )
         
         # Testar conexão
-        mongo_client.admin.command('ping')
+        client.admin.command('ping')
         
-        database = mongo_client[DB_NAME]
+        # Só publica a conexão depois do ping, para as requisições não usarem um banco inacessível
+        mongo_client = client
+        database = client[DB_NAME]
         logger.info(f"✅ MongoDB conectado! Banco: {DB_NAME}")
         
-        # Criar índices se necessário
-        database.sessions.create_index("session_id", unique=True)
-        database.datasets.create_index("session_id")
-        
         return True
         
     except Exception as e:
@@ -134,9 +162,15 @@ def init_mongodb():
         database = None
         return False
 
-# Inicializar MongoDB se disponível
-if MONGODB_AVAILABLE:
-    init_mongodb()
+def create_mongodb_indexes():
+    """Cria os índices do MongoDB - executar uma vez no deploy (api/setup-mongodb.py)"""
+    if database is None:
+        return False
+    
+    database.sessions.create_index("session_id", unique=True)
+    database.datasets.create_index("session_id")
+    logger.info("✅ Índices do MongoDB criados")
+    return True
 
 # Funções auxiliares para salvar/carregar do MongoDB
 def save_session_to_db(session_id: str, session_data: dict):
@@ -175,6 +209,9 @@ def save_dataset_to_db(session_id: str, dataset_data: dict):
             "outliers_info": dataset_data.get("outliers_info", {}),
             "correlation_matrix": dataset_data.get("correlation_matrix", {}),
             "insights": dataset_data.get("insights", []),
+            "missingness": dataset_data.get("missingness", {}),
+            "categorical_associations": dataset_data.get("categorical_associations", {}),
+            "distributions": dataset_data.get("distributions", {}),
             "uploaded_at": dataset_data.get("uploaded_at", datetime.now()),
             "source_file": dataset_data.get("source_file", "upload"),
             "updated_at": datetime.now()
@@ -203,10 +240,239 @@ def load_session_from_db(session_id: str):
         logger.error(f"❌ Erro ao carregar sessão do MongoDB: {e}")
         return None
 
+# Profiling sob demanda - permite diagnosticar requisições lentas com dados reais
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "/tmp/eda_profiles"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_MAX_REPORTS = int(os.getenv("PROFILE_MAX_REPORTS", "20"))
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
+PROFILED_PATHS = {"/api/upload-csv", "/api/chat"}
+
+# Só um profiling por vez (tracemalloc é global ao processo)
+_profiling_lock = threading.Lock()
+
+class StackSampler:
+    """Profiler por amostragem: captura a pilha de uma thread em intervalos fixos"""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+
+            # Formato "folded" (raiz primeiro), compatível com flamegraph.pl / speedscope
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _label(self, code) -> str:
+        # Cache por code object para não pesar na requisição amostrada
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def folded(self) -> str:
+        """Pilhas no formato folded: 'frame1;frame2;... contagem'"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 15):
+        """Funções com mais amostras, contando tempo próprio e tempo total"""
+        self_time = Counter()
+        total_time = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_time[frames[-1]] += count
+            for frame in set(frames):
+                total_time[frame] += count
+
+        return [
+            {
+                "function": frame,
+                "total_samples": count,
+                "self_samples": self_time.get(frame, 0),
+                "total_pct": round(count / self.samples * 100, 1) if self.samples else 0.0
+            }
+            for frame, count in total_time.most_common(limit)
+        ]
+
+def _profiling_requested(request: Request) -> bool:
+    """Verifica se o cliente pediu profiling via header X-Profile ou ?profile=1"""
+    flag = request.headers.get("x-profile") or request.query_params.get("profile") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+def _is_admin(token: Optional[str]) -> bool:
+    """Confere o token de administrador (profiling fica desabilitado sem token configurado)"""
+    if not PROFILING_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, PROFILING_ADMIN_TOKEN)
+
+def _format_memory_report(snapshot: tracemalloc.Snapshot, current: int, peak: int, limit: int = 30) -> str:
+    """Gera relatório de alocações a partir de um snapshot do tracemalloc"""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+    lines = [
+        f"Memória alocada ao final da requisição: {current / 1024**2:.2f} MB",
+        f"Pico de memória durante a requisição: {peak / 1024**2:.2f} MB",
+        "",
+        f"TOP {limit} LINHAS POR MEMÓRIA RETIDA:"
+    ]
+    for stat in snapshot.statistics("lineno")[:limit]:
+        lines.append(f"  {stat}")
+
+    lines.append("")
+    lines.append("TOP 5 PILHAS DE ALOCAÇÃO:")
+    for stat in snapshot.statistics("traceback")[:5]:
+        lines.append(f"  {stat.size / 1024:.1f} KiB em {stat.count} blocos")
+        for line in stat.traceback.format(limit=10):
+            lines.append(f"    {line}")
+
+    return "\n".join(lines)
+
+def _prune_profiles():
+    """Mantém apenas os relatórios mais recentes no diretório de profiling"""
+    reports = sorted(
+        (p for p in PROFILE_DIR.iterdir() if p.is_dir()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for old in reports[PROFILE_MAX_REPORTS:]:
+        for artifact in old.iterdir():
+            artifact.unlink()
+        old.rmdir()
+
+def _save_profile(profile_id: str, summary: dict, folded: str, memory_report: str):
+    """Grava os artefatos do profiling em PROFILE_DIR/<profile_id>/"""
+    report_dir = PROFILE_DIR / profile_id
+    report_dir.mkdir(parents=True, exist_ok=True)
+    (report_dir / "stacks.folded").write_text(folded, encoding="utf-8")
+    (report_dir / "memory.txt").write_text(memory_report, encoding="utf-8")
+    (report_dir / "summary.json").write_text(json.dumps(summary, indent=2, default=str), encoding="utf-8")
+    _prune_profiles()
+
+class ProfilingMiddleware:
+    """Envolve /api/upload-csv e /api/chat em profiler + tracemalloc quando solicitado
+    
+    ASGI puro: as demais rotas passam direto. Fica dentro do CORS, então o 403 e as
+    respostas com profiling também recebem os headers de CORS.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in PROFILED_PATHS:
+            return await self.app(scope, receive, send)
+        
+        request = Request(scope)
+        if not _profiling_requested(request):
+            return await self.app(scope, receive, send)
+        
+        if not _is_admin(request.headers.get("x-admin-token")):
+            response = JSONResponse(status_code=403, content={"detail": "Profiling requer token de administrador"})
+            return await response(scope, receive, send)
+        
+        if not _profiling_lock.acquire(blocking=False):
+            logger.warning("⏱️ Profiling já em andamento - requisição executada sem profiling")
+            
+            async def send_skipped(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("X-Profile-Skipped", "busy")
+                await send(message)
+            
+            return await self.app(scope, receive, send_skipped)
+        
+        try:
+            profile_id = uuid.uuid4().hex
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+            
+            # A resposta fica retida até o relatório ser salvo, para levar o X-Profile-Id
+            messages = []
+            
+            async def buffer(message):
+                messages.append(message)
+            
+            # Handlers async rodam na thread do event loop, então amostramos ela
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, buffer)
+            finally:
+                duration = time.perf_counter() - start
+                sampler.stop()
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+            
+            response_start = next((m for m in messages if m["type"] == "http.response.start"), None)
+            summary = {
+                "profile_id": profile_id,
+                "path": scope["path"],
+                "method": scope["method"],
+                "status_code": response_start["status"] if response_start else None,
+                "duration_ms": round(duration * 1000, 2),
+                "samples": sampler.samples,
+                "sample_interval_ms": sampler.interval * 1000,
+                "memory_current_mb": round(current / 1024**2, 2),
+                "memory_peak_mb": round(peak / 1024**2, 2),
+                "top_functions": sampler.top_functions(),
+                "created_at": datetime.now()
+            }
+            
+            try:
+                _save_profile(profile_id, summary, sampler.folded(), _format_memory_report(snapshot, current, peak))
+                if response_start is not None:
+                    MutableHeaders(scope=response_start).append("X-Profile-Id", profile_id)
+                logger.info(f"⏱️ Profiling {profile_id} salvo ({summary['duration_ms']} ms, {sampler.samples} amostras)")
+            except Exception as e:
+                logger.error(f"❌ Erro ao salvar profiling: {e}")
+            
+            for message in messages:
+                await send(message)
+        finally:
+            _profiling_lock.release()
+
+# Camada mais interna (depois do CORS), diferente de add_middleware, que a colocaria por fora
+app.user_middleware.append(Middleware(ProfilingMiddleware))
+
 # Modelos de dados
 class ChatMessage(BaseModel):
     message: str
     session_id: str
+    exact: bool = False  # Em sessões amostradas, dispara o recálculo exato em background
+
+class TargetRequest(BaseModel):
+    target: str
 
 class AnalysisResponse(BaseModel):
     response: str
@@ -220,14 +486,542 @@ class SessionData(BaseModel):
     conversation_history: List[Dict]
     created_at: datetime
 
+# Tabela de popcount por byte - contagem de bits vetorizada (np.bitwise_count só existe no numpy 2)
+_POPCOUNT_TABLE = None
+
+def _popcount(bits) -> "np.ndarray":
+    """Conta bits ligados em cada linha de uma matriz de bytes (uint8)"""
+    global _POPCOUNT_TABLE
+    import numpy as np
+    
+    if _POPCOUNT_TABLE is None:
+        _POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+    return _POPCOUNT_TABLE[bits].sum(axis=-1, dtype=np.int64)
+
+class MissingnessIndex:
+    """Bitmaps de valores ausentes por coluna (1 bit por linha), montados uma vez na ingestão
+    
+    Cada bloco de linhas vira um segmento (p x bytes). Contagens por coluna, co-ausência e
+    linhas incompletas são totais acumulados a cada segmento, então o resumo não depende
+    do número de linhas; os bitmaps atendem consultas por subconjunto de colunas (OR + popcount).
+    `extended` devolve um novo índice, então índices compartilhados nunca são alterados.
+    """
+    
+    def __init__(self, columns: List[str]):
+        import numpy as np
+        
+        self.columns = list(columns)
+        self.n_rows = 0
+        self.segments = []
+        self.pattern_counts = Counter()
+        self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.incomplete_rows = 0
+        # Co-ausência só entre colunas que já tiveram ausentes (posição -> linha da matriz)
+        self.co_positions = {}
+        self.co_matrix = np.zeros((0, 0), dtype=np.int64)
+    
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame") -> "MissingnessIndex":
+        index = cls(df.columns.tolist())
+        index._add_segment(df)
+        return index
+    
+    def extended(self, chunk: "pd.DataFrame") -> "MissingnessIndex":
+        """Novo índice com as linhas do bloco anexadas (custo proporcional ao bloco)"""
+        index = MissingnessIndex(self.columns)
+        index.n_rows = self.n_rows
+        index.segments = list(self.segments)
+        index.pattern_counts = Counter(self.pattern_counts)
+        index.null_counts = self.null_counts.copy()
+        index.incomplete_rows = self.incomplete_rows
+        index.co_positions = dict(self.co_positions)
+        index.co_matrix = self.co_matrix.copy()
+        index._add_segment(chunk[self.columns])
+        return index
+    
+    def _add_segment(self, df: "pd.DataFrame"):
+        import numpy as np
+        
+        mask = df.isna().to_numpy()
+        self.segments.append(np.ascontiguousarray(np.packbits(mask, axis=0).T))
+        self.n_rows += len(df)
+        self.null_counts += mask.sum(axis=0)
+        
+        # Padrões por linha: só as colunas com ausentes e só as linhas incompletas
+        null_cols = np.flatnonzero(mask.any(axis=0))
+        if len(null_cols):
+            rows = mask[:, null_cols]
+            rows = rows[rows.any(axis=1)]
+            self.incomplete_rows += len(rows)
+            
+            new_cols = [int(i) for i in null_cols if int(i) not in self.co_positions]
+            if new_cols:
+                size = len(self.co_positions)
+                for i in new_cols:
+                    self.co_positions[i] = len(self.co_positions)
+                grown = np.zeros((len(self.co_positions), len(self.co_positions)), dtype=np.int64)
+                grown[:size, :size] = self.co_matrix
+                self.co_matrix = grown
+            
+            # Produto em float64 (BLAS) é exato para contagens até 2^53
+            weights = rows.astype(np.float64)
+            slots = [self.co_positions[int(i)] for i in null_cols]
+            self.co_matrix[np.ix_(slots, slots)] += np.rint(weights.T @ weights).astype(np.int64)
+            
+            patterns, counts = np.unique(np.packbits(rows, axis=1), axis=0, return_counts=True)
+            unpacked = np.unpackbits(patterns, axis=1, count=len(null_cols)).astype(bool)
+            for pattern, count in zip(unpacked, counts):
+                self.pattern_counts[tuple(self.columns[i] for i in null_cols[pattern])] += int(count)
+    
+    def _column_positions(self, columns: List[str]) -> List[int]:
+        unknown = [col for col in columns if col not in self.columns]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Colunas não encontradas: {unknown}")
+        return [self.columns.index(col) for col in columns]
+    
+    def column_counts(self) -> Dict:
+        """Valores ausentes por coluna (equivalente a isnull().sum())"""
+        return {col: int(count) for col, count in zip(self.columns, self.null_counts)}
+    
+    def co_missing(self) -> Dict:
+        """Matriz de co-ausência (linhas em que as duas colunas estão ausentes) das colunas com ausentes"""
+        positions = sorted(self.co_positions)
+        slots = [self.co_positions[i] for i in positions]
+        return {
+            self.columns[i]: {self.columns[j]: int(self.co_matrix[a, b]) for j, b in zip(positions, slots)}
+            for i, a in zip(positions, slots)
+        }
+    
+    def complete_rows(self, columns: Optional[List[str]] = None) -> int:
+        """Linhas sem nenhum ausente no subconjunto de colunas (todas por padrão)"""
+        import numpy as np
+        
+        if not columns:
+            return self.n_rows - self.incomplete_rows
+        
+        positions = self._column_positions(columns)
+        incomplete = 0
+        for bits in self.segments:
+            incomplete += int(_popcount(np.bitwise_or.reduce(bits[positions], axis=0)))
+        return self.n_rows - incomplete
+    
+    def top_patterns(self, limit: int = 10) -> List[Dict]:
+        """Combinações de colunas ausentes mais frequentes nas linhas"""
+        return [
+            {
+                "columns": list(columns),
+                "count": count,
+                "percentage": (count / self.n_rows) * 100 if self.n_rows else 0.0
+            }
+            for columns, count in self.pattern_counts.most_common(limit)
+        ]
+    
+    def summary(self, limit: int = 10) -> Dict:
+        return {
+            "total_rows": self.n_rows,
+            "complete_rows": self.complete_rows(),
+            "column_counts": self.column_counts(),
+            "co_missing": self.co_missing(),
+            "top_patterns": self.top_patterns(limit)
+        }
+
+# Perfil categórico - cada coluna é fatorada uma vez e tudo sai de um bincount
+CATEGORICAL_TOP_K = int(os.getenv("CATEGORICAL_TOP_K", "10"))
+CATEGORICAL_RARE_THRESHOLD = float(os.getenv("CATEGORICAL_RARE_THRESHOLD", "0.01"))
+CATEGORICAL_ASSOC_MAX_LEVELS = int(os.getenv("CATEGORICAL_ASSOC_MAX_LEVELS", "100"))
+
+def _to_python(value):
+    """Converte escalares numpy para tipos nativos (serializáveis em JSON)"""
+    return value.item() if hasattr(value, "item") else value
+
+def categorical_stats_from_counts(levels, counts, top_k: int = CATEGORICAL_TOP_K) -> Dict:
+    """Distintos, moda, top-k e fração de níveis raros a partir das frequências de cada nível"""
+    import numpy as np
+    
+    total = int(counts.sum())
+    
+    if not len(counts):
+        return {"unique_count": 0, "most_frequent": None, "frequency_top": 0,
+                "top_values": [], "rare_levels": 0, "rare_share": 0.0}
+    
+    top = int(counts.max())
+    # Mesmo critério do mode() do pandas: em empate, o menor valor
+    candidates = list(levels[counts == top])
+    try:
+        most_frequent = min(candidates)
+    except TypeError:
+        most_frequent = candidates[0]
+    
+    order = np.argsort(-counts, kind="stable")[:top_k]
+    rare = counts < total * CATEGORICAL_RARE_THRESHOLD
+    
+    return {
+        "unique_count": len(levels),
+        "most_frequent": _to_python(most_frequent),
+        "frequency_top": top,
+        "top_values": [
+            {"value": _to_python(levels[i]), "count": int(counts[i]), "percentage": float(counts[i] / total * 100)}
+            for i in order
+        ],
+        "rare_levels": int(rare.sum()),
+        "rare_share": float(counts[rare].sum() / total) if total else 0.0
+    }
+
+def association_from_table(table) -> tuple:
+    """(V de Cramér, qui-quadrado, graus de liberdade, n) de uma tabela de contingência"""
+    import numpy as np
+    
+    # Remove níveis sem observações nas linhas válidas do par
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    r, c = table.shape
+    if n == 0 or min(r, c) < 2:
+        return 0.0, 0.0, 0, int(n)
+    
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = float(((table - expected) ** 2 / expected).sum())
+    return float(np.sqrt(chi2 / n / (min(r, c) - 1))), chi2, (r - 1) * (c - 1), int(n)
+
+class CategoricalProfile:
+    """Códigos inteiros (pd.factorize) e frequências (np.bincount) das colunas categóricas"""
+    
+    def __init__(self, df: "pd.DataFrame", columns: List[str]):
+        import numpy as np
+        import pandas as pd
+        
+        self.columns = list(columns)
+        self.codes = {}
+        self.levels = {}
+        self.counts = {}
+        for col in self.columns:
+            codes, uniques = pd.factorize(df[col])
+            self.codes[col] = codes
+            self.levels[col] = np.asarray(uniques, dtype=object)
+            self.counts[col] = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    
+    def column_stats(self, col: str, top_k: int = CATEGORICAL_TOP_K) -> Dict:
+        return categorical_stats_from_counts(self.levels[col], self.counts[col], top_k)
+    
+    def association_matrix(self) -> Dict:
+        """Qui-quadrado e V de Cramér entre pares de colunas categóricas
+        
+        A tabela de contingência de cada par é um bincount sobre o código combinado
+        a * k_b + b; colunas com mais de CATEGORICAL_ASSOC_MAX_LEVELS níveis ficam de fora.
+        """
+        import numpy as np
+        
+        columns = [col for col in self.columns if 1 < len(self.levels[col]) <= CATEGORICAL_ASSOC_MAX_LEVELS]
+        skipped = [col for col in self.columns if col not in columns]
+        
+        cramers_v = {col: {col: 1.0} for col in columns}
+        chi_square = {}
+        
+        for i, col_a in enumerate(columns):
+            for col_b in columns[i + 1:]:
+                a, b = self.codes[col_a], self.codes[col_b]
+                k_b = len(self.levels[col_b])
+                valid = (a >= 0) & (b >= 0)
+                table = np.bincount(
+                    a[valid] * k_b + b[valid], minlength=len(self.levels[col_a]) * k_b
+                ).reshape(-1, k_b)
+                v, chi2, dof, n = association_from_table(table)
+                
+                cramers_v[col_a][col_b] = v
+                cramers_v[col_b][col_a] = v
+                chi_square[f"{col_a}|{col_b}"] = {"chi2": chi2, "dof": dof, "n": n}
+        
+        return {"cramers_v": cramers_v, "chi_square": chi_square, "skipped_columns": skipped}
+
+# Distribuições compactas guardadas no perfil - permitem comparar sessões sem os dados
+DISTRIBUTION_QUANTILES = int(os.getenv("DISTRIBUTION_QUANTILES", "101"))  # 0%, 1%, ..., 100%
+DISTRIBUTION_MAX_LEVELS = int(os.getenv("DISTRIBUTION_MAX_LEVELS", "50"))
+
+def numeric_distribution(count: int, quantiles) -> Dict:
+    return {"count": int(count), "quantiles": [float(q) for q in quantiles] if count else None}
+
+def categorical_distribution(levels, counts, max_levels: int = DISTRIBUTION_MAX_LEVELS) -> Dict:
+    """Níveis mais frequentes e o total dos demais (listas, não dict - níveis viram chaves ruins no MongoDB)"""
+    import numpy as np
+    
+    order = np.argsort(-counts, kind="stable")[:max_levels]
+    total = int(counts.sum())
+    kept = int(counts[order].sum())
+    return {
+        "count": total,
+        "levels": [_to_python(levels[i]) for i in order],
+        "counts": [int(counts[i]) for i in order],
+        "other": total - kept
+    }
+
+# Séries temporais - detecção de colunas de data/offset e reamostragem no servidor
+TIMESERIES_MAX_POINTS = int(os.getenv("TIMESERIES_MAX_POINTS", "2000"))
+TIMESERIES_MAX_BUCKETS = int(os.getenv("TIMESERIES_MAX_BUCKETS", "100000"))
+TIMESERIES_ROLLING_WINDOW = int(os.getenv("TIMESERIES_ROLLING_WINDOW", "7"))
+
+# Nomes típicos de colunas com segundos desde um início (ex.: Time do creditcard)
+# (o nome inteiro ou um termo separado por _/espaço - "event_time" sim, "runtime_ms" e "temporada" não)
+_OFFSET_NAME = re.compile(
+    r"^t$|(?:^|[\W_])(time|timestamp|seconds?|secs?|elapsed|offset|tempo|segundos?)(?:$|[\W_])", re.IGNORECASE
+)
+_DATE_LIKE = re.compile(r"\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}|\d{1,2}:\d{2}")
+
+# Tamanhos de balde "redondos": (segundos, rótulo)
+_BUCKET_SIZES = [
+    (1, "1s"), (2, "2s"), (5, "5s"), (10, "10s"), (15, "15s"), (30, "30s"),
+    (60, "1min"), (120, "2min"), (300, "5min"), (600, "10min"), (900, "15min"), (1800, "30min"),
+    (3600, "1h"), (7200, "2h"), (10800, "3h"), (21600, "6h"), (43200, "12h"),
+    (86400, "1D"), (172800, "2D"), (604800, "7D"), (2592000, "30D"), (7776000, "90D"), (31536000, "365D")
+]
+
+def parse_datetime_columns(df: "pd.DataFrame", columns: Optional[List[str]] = None) -> List[str]:
+    """Converte (in place) colunas de texto com datas para datetime64; retorna as convertidas
+    
+    Sem `columns`, testa cada coluna de texto numa amostra de 200 valores antes de
+    converter a coluna inteira; com `columns`, converte direto (usado nos appends).
+    """
+    import pandas as pd
+    
+    converted = []
+    candidates = columns if columns is not None else df.select_dtypes(include=['object']).columns
+    
+    for col in candidates:
+        series = df[col]
+        if columns is None:
+            sample = series.dropna().head(200).astype(str)
+            if sample.empty or sample.str.contains(_DATE_LIKE).mean() < 0.95:
+                continue
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parsed = pd.to_datetime(series, errors="coerce")
+        
+        # Aceita só se quase tudo que não era nulo virou data
+        if columns is None and parsed.isna().sum() > series.isna().sum() + len(series) * 0.05:
+            continue
+        
+        df[col] = parsed
+        converted.append(col)
+    
+    return converted
+
+def detect_time_columns(df: "pd.DataFrame") -> Dict:
+    """Colunas temporais: datetime64 ('datetime') ou numéricas crescentes com nome de tempo ('offset')"""
+    import pandas as pd
+    
+    time_columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            time_columns[col] = "datetime"
+        elif (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+              and _OFFSET_NAME.search(str(col))):
+            values = series.dropna()
+            if len(values) > 1 and values.min() >= 0 and values.is_monotonic_increasing:
+                time_columns[col] = "offset"
+    return time_columns
+
+def _pick_bucket(span_seconds: float, max_points: int):
+    """Menor balde redondo que mantém a série em até max_points pontos"""
+    target = span_seconds / max(max_points, 1)
+    for seconds, label in _BUCKET_SIZES:
+        if seconds >= target:
+            return seconds, label
+    days = int(-(-target // 86400))
+    return days * 86400, f"{days}D"
+
+def _parse_bucket(freq: str) -> float:
+    """Converte um rótulo de frequência ('15min', '1h', '1D') em segundos"""
+    import pandas as pd
+    
+    try:
+        seconds = pd.Timedelta(freq).total_seconds()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Frequência inválida: {freq}")
+    if seconds <= 0:
+        raise HTTPException(status_code=400, detail=f"Frequência inválida: {freq}")
+    return seconds
+
+class TimeSeriesIndex:
+    """Índice temporal ordenado de uma coluna (ordem das linhas + tempos em segundos)
+    
+    A ordenação é feita uma vez; cada reamostragem é um agrupamento linear sobre
+    baldes contíguos (np.add.reduceat), então um ano de dados por segundo vira
+    alguns milhares de pontos sem passar os dados brutos para o frontend.
+    """
+    
+    def __init__(self, times: "pd.Series", kind: str):
+        import numpy as np
+        
+        self.kind = kind
+        if kind == "datetime":
+            if getattr(times.dt, "tz", None) is not None:
+                times = times.dt.tz_convert(None)
+            valid = times.notna().to_numpy()
+            seconds = times.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+        else:
+            seconds = times.to_numpy(dtype=float)
+            valid = ~np.isnan(seconds)
+        
+        positions = np.flatnonzero(valid)
+        order = np.argsort(seconds[positions], kind="stable")
+        self.order = positions[order]
+        self.seconds = seconds[positions][order]
+    
+    def resample(self, values=None, freq: Optional[str] = None, max_points: int = TIMESERIES_MAX_POINTS,
+                 window: int = TIMESERIES_ROLLING_WINDOW) -> Dict:
+        """Agregados por balde (count/sum/mean/quantis) e estatísticas móveis sobre os baldes"""
+        import numpy as np
+        import pandas as pd
+        
+        if len(self.seconds) == 0:
+            return None
+        
+        start, end = self.seconds[0], self.seconds[-1]
+        if freq:
+            width, label = _parse_bucket(freq), freq
+        else:
+            width, label = _pick_bucket(end - start, max_points)
+        
+        first_bucket = np.floor(start / width)
+        n_buckets = int(np.floor(end / width) - first_bucket) + 1
+        if n_buckets > TIMESERIES_MAX_BUCKETS:
+            raise HTTPException(status_code=400, detail=f"Frequência {freq} gera {n_buckets} pontos - use um intervalo maior")
+        
+        buckets = (np.floor(self.seconds / width) - first_bucket).astype(np.int64)
+        count = np.bincount(buckets, minlength=n_buckets)
+        result = {"freq": label, "bucket_seconds": width, "count": count}
+        
+        if values is not None:
+            v = np.asarray(values, dtype=float)[self.order]
+            valid = ~np.isnan(v)
+            n_valid = np.bincount(buckets, weights=valid, minlength=n_buckets)
+            total = np.bincount(buckets, weights=np.where(valid, v, 0.0), minlength=n_buckets)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = total / n_valid
+            
+            # Quantis: ordena por (balde, valor); NaN vai para o fim de cada balde
+            sorted_values = v[np.lexsort((v, buckets))]
+            bucket_start = np.concatenate([[0], np.cumsum(count)[:-1]])
+            for q, key in ((0.25, "p25"), (0.5, "p50"), (0.75, "p75")):
+                pos = bucket_start + q * np.maximum(n_valid - 1, 0)
+                low = np.floor(pos).astype(np.int64)
+                high = np.minimum(np.ceil(pos).astype(np.int64), bucket_start + np.maximum(n_valid - 1, 0).astype(np.int64))
+                low = np.minimum(low, len(v) - 1)
+                high = np.minimum(high, len(v) - 1)
+                frac = pos - low
+                quantile = sorted_values[low] * (1 - frac) + sorted_values[high] * frac
+                result[key] = np.where(n_valid > 0, quantile, np.nan)
+            
+            rolling = pd.Series(mean).rolling(window, min_periods=1)
+            result.update({
+                "sum": total,
+                "mean": mean,
+                "rolling_mean": rolling.mean().to_numpy(),
+                "rolling_std": rolling.std().to_numpy(),
+                "rolling_window": window
+            })
+        
+        # Início de cada balde: timestamp ISO (datetime) ou segundos (offset)
+        bucket_seconds = (first_bucket + np.arange(n_buckets)) * width
+        if self.kind == "datetime":
+            result["x"] = pd.to_datetime(bucket_seconds, unit="s").strftime("%Y-%m-%dT%H:%M:%S").tolist()
+        else:
+            result["x"] = bucket_seconds.tolist()
+        
+        # JSON não aceita NaN
+        for key, array in list(result.items()):
+            if isinstance(array, np.ndarray):
+                if np.issubdtype(array.dtype, np.integer):
+                    result[key] = array.tolist()
+                else:
+                    result[key] = np.where(np.isnan(array), None, array).tolist()
+        return result
+
+def build_insights(n_rows: int, missing_values: Dict, outliers: Dict, correlations: Dict,
+                   numeric_columns: List[str], categorical_columns: List[str]):
+    """Gera insights a partir das estatísticas já calculadas do dataset"""
+    insights = []
+    
+    # Insights sobre valores ausentes
+    high_missing = [col for col, count in missing_values.items() if count > n_rows * 0.5]
+    if high_missing:
+        insights.append(f"⚠️ Colunas com mais de 50% de valores ausentes: {', '.join(high_missing)}")
+    
+    # Insights sobre outliers
+    high_outliers = {k: v for k, v in outliers.items() if v['percentage'] > 10}
+    if high_outliers:
+        insights.append(f"📊 Colunas com muitos outliers (>10%): {', '.join(high_outliers.keys())}")
+    
+    # Insights sobre correlações
+    if correlations:
+        # Encontrar correlações fortes
+        strong_correlations = []
+        for col1 in correlations:
+            for col2 in correlations[col1]:
+                if col1 != col2 and abs(correlations[col1][col2]) > 0.7:
+                    strong_correlations.append(f"{col1} ↔ {col2} ({correlations[col1][col2]:.2f})")
+        
+        if strong_correlations:
+            insights.append(f"🔗 Correlações fortes encontradas: {'; '.join(strong_correlations[:3])}")
+    
+    # Insights sobre distribuição
+    if numeric_columns:
+        insights.append(f"📈 {len(numeric_columns)} colunas numéricas disponíveis para análise")
+    
+    if categorical_columns:
+        insights.append(f"📝 {len(categorical_columns)} colunas categóricas disponíveis para análise")
+    
+    return insights
+
+def cached_chart(method):
+    """Memoriza o gráfico no chart_cache do analisador (quando o cache está ativo)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.chart_cache is None:
+            return method(self, *args, **kwargs)
+        
+        key = ":".join([method.__name__, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))])
+        if key not in self.chart_cache:
+            self.chart_cache[key] = method(self, *args, **kwargs)
+        return self.chart_cache[key]
+    return wrapper
+
 # Classe principal que faz a análise dos dados
 class DataAnalyzer:
     """Analisa datasets e gera insights"""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: "pd.DataFrame", chart_cache: Optional[Dict] = None):
+        import numpy as np
+        
         self.df = df
+        # Só datasets reutilizados (catálogo de exemplos) guardam gráficos prontos
+        self.chart_cache = chart_cache
+        self._missingness = None
+        self._categorical = None
+        self._time_indexes = {}
         self.numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
         self.categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        self.time_columns = detect_time_columns(df)
+    
+    @property
+    def missingness(self) -> MissingnessIndex:
+        """Bitmaps de ausentes, montados na primeira análise e reutilizados pelas demais"""
+        if self._missingness is None:
+            self._missingness = MissingnessIndex.from_frame(self.df)
+        return self._missingness
+    
+    @property
+    def categorical(self) -> CategoricalProfile:
+        """Colunas categóricas fatoradas uma única vez"""
+        if self._categorical is None:
+            self._categorical = CategoricalProfile(self.df, self.categorical_columns)
+        return self._categorical
+    
+    def time_index(self, column: str) -> TimeSeriesIndex:
+        """Índice temporal ordenado da coluna, criado uma vez por analisador"""
+        if column not in self._time_indexes:
+            self._time_indexes[column] = TimeSeriesIndex(self.df[column], self.time_columns[column])
+        return self._time_indexes[column]
     
     def get_basic_info(self):
         """Pega informações básicas do dataset"""
@@ -235,9 +1029,10 @@ class DataAnalyzer:
             "shape": self.df.shape,
             "columns": self.df.columns.tolist(),
             "dtypes": self.df.dtypes.astype(str).to_dict(),
-            "missing_values": self.df.isnull().sum().to_dict(),
+            "missing_values": self.missingness.column_counts(),
             "numeric_columns": self.numeric_columns,
             "categorical_columns": self.categorical_columns,
+            "time_columns": self.time_columns,
             "memory_usage": f"{self.df.memory_usage(deep=True).sum() / 1024**2:.2f} MB"
         }
     
@@ -252,14 +1047,9 @@ class DataAnalyzer:
         
         # Para colunas categóricas
         if self.categorical_columns:
-            categorical_stats = {}
-            for col in self.categorical_columns:
-                categorical_stats[col] = {
-                    "unique_count": self.df[col].nunique(),
-                    "most_frequent": self.df[col].mode().iloc[0] if not self.df[col].empty else None,
-                    "frequency_top": self.df[col].value_counts().iloc[0] if not self.df[col].empty else 0
-                }
-            stats["categorical"] = categorical_stats
+            stats["categorical"] = {
+                col: self.categorical.column_stats(col) for col in self.categorical_columns
+            }
         
         return stats
     
@@ -291,44 +1081,36 @@ class DataAnalyzer:
             return correlation.to_dict()
         return {}
     
-    def generate_insights(self):
-        """Gera insights básicos sobre os dados"""
-        insights = []
+    def get_distributions(self) -> Dict:
+        """Quantis (grade de DISTRIBUTION_QUANTILES pontos) e frequências por coluna"""
+        import numpy as np
         
-        # Insights sobre valores ausentes
-        missing_data = self.df.isnull().sum()
-        high_missing = missing_data[missing_data > len(self.df) * 0.5]
-        if not high_missing.empty:
-            insights.append(f"⚠️ Colunas com mais de 50% de valores ausentes: {', '.join(high_missing.index)}")
-        
-        # Insights sobre outliers
-        outliers = self.find_outliers()
-        high_outliers = {k: v for k, v in outliers.items() if v['percentage'] > 10}
-        if high_outliers:
-            insights.append(f"📊 Colunas com muitos outliers (>10%): {', '.join(high_outliers.keys())}")
-        
-        # Insights sobre correlações
-        correlations = self.get_correlations()
-        if correlations:
-            # Encontrar correlações fortes
-            strong_correlations = []
-            for col1 in correlations:
-                for col2 in correlations[col1]:
-                    if col1 != col2 and abs(correlations[col1][col2]) > 0.7:
-                        strong_correlations.append(f"{col1} ↔ {col2} ({correlations[col1][col2]:.2f})")
-            
-            if strong_correlations:
-                insights.append(f"🔗 Correlações fortes encontradas: {'; '.join(strong_correlations[:3])}")
-        
-        # Insights sobre distribuição
-        if self.numeric_columns:
-            insights.append(f"📈 {len(self.numeric_columns)} colunas numéricas disponíveis para análise")
+        grid = np.linspace(0, 1, DISTRIBUTION_QUANTILES)
+        numeric = {}
+        for col in self.numeric_columns:
+            values = self.df[col].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            numeric[col] = numeric_distribution(len(values), np.quantile(values, grid) if len(values) else [])
         
-        if self.categorical_columns:
-            insights.append(f"📝 {len(self.categorical_columns)} colunas categóricas disponíveis para análise")
+        categorical = {
+            col: categorical_distribution(self.categorical.levels[col], self.categorical.counts[col])
+            for col in self.categorical_columns
+        }
         
-        return insights
+        return {"numeric": numeric, "categorical": categorical}
+    
+    def generate_insights(self, outliers: Dict = None, correlations: Dict = None):
+        """Gera insights básicos sobre os dados (aceita outliers/correlações já calculados)"""
+        return build_insights(
+            len(self.df),
+            self.missingness.column_counts(),
+            outliers if outliers is not None else self.find_outliers(),
+            correlations if correlations is not None else self.get_correlations(),
+            self.numeric_columns,
+            self.categorical_columns
+        )
     
+    @cached_chart
     def create_histogram_data(self, column: str):
         """Cria dados para histograma"""
         if column not in self.df.columns:
@@ -354,6 +1136,7 @@ class DataAnalyzer:
             }
         }
     
+    @cached_chart
     def create_correlation_heatmap_data(self):
         """Cria dados para heatmap de correlação"""
         if len(self.numeric_columns) < 2:
@@ -379,6 +1162,7 @@ class DataAnalyzer:
             }
         }
     
+    @cached_chart
     def create_scatter_plot_data(self, x_col: str, y_col: str, color_col: str = None):
         """Cria dados para gráfico de dispersão"""
         if x_col not in self.df.columns or y_col not in self.df.columns:
@@ -410,6 +1194,87 @@ class DataAnalyzer:
         
         return data
     
+    @cached_chart
+    def create_association_heatmap_data(self):
+        """Cria dados para heatmap de associação (V de Cramér) entre categóricas"""
+        cramers_v = self.categorical.association_matrix()["cramers_v"]
+        if len(cramers_v) < 2:
+            return None
+        
+        columns = list(cramers_v)
+        
+        return {
+            "type": "heatmap",
+            "title": "Associação entre Variáveis Categóricas (V de Cramér)",
+            "data": {
+                "z": [[cramers_v[row][col] for col in columns] for row in columns],
+                "x": columns,
+                "y": columns,
+                "type": "heatmap",
+                "colorscale": "Viridis",
+                "zmin": 0,
+                "zmax": 1
+            },
+            "layout": {
+                "title": "Associação entre Variáveis Categóricas (V de Cramér)",
+                "xaxis": {"title": ""},
+                "yaxis": {"title": ""}
+            }
+        }
+    
+    def resample_time_series(self, time_col: str, value_col: str = None, freq: str = None,
+                             window: int = TIMESERIES_ROLLING_WINDOW):
+        """Agregados de value_col por intervalo de tempo (ou contagens, sem value_col)"""
+        if time_col not in self.time_columns:
+            raise HTTPException(status_code=400, detail=f"Coluna {time_col} não é temporal")
+        
+        values = None
+        if value_col:
+            if value_col not in self.numeric_columns:
+                raise HTTPException(status_code=400, detail=f"Coluna {value_col} não é numérica")
+            values = self.df[value_col].to_numpy(dtype=float)
+        
+        return self.time_index(time_col).resample(values, freq=freq, window=window)
+    
+    @cached_chart
+    def create_timeseries_data(self, time_col: str, value_col: str = None, freq: str = None):
+        """Cria dados para série temporal reamostrada (média, faixa p25-p75 e média móvel)"""
+        if time_col not in self.time_columns:
+            return None
+        
+        series = self.resample_time_series(time_col, value_col, freq)
+        if series is None:
+            return None
+        
+        title = f"{value_col or 'Registros'} ao longo de {time_col} (intervalo {series['freq']})"
+        
+        if value_col:
+            traces = [
+                {"x": series["x"], "y": series["p25"], "type": "scatter", "mode": "lines",
+                 "line": {"width": 0}, "name": "p25", "showlegend": False},
+                {"x": series["x"], "y": series["p75"], "type": "scatter", "mode": "lines",
+                 "line": {"width": 0}, "fill": "tonexty", "name": "p25-p75"},
+                {"x": series["x"], "y": series["mean"], "type": "scatter", "mode": "lines", "name": "Média"},
+                {"x": series["x"], "y": series["rolling_mean"], "type": "scatter", "mode": "lines",
+                 "line": {"dash": "dash"}, "name": f"Média móvel ({series['rolling_window']})"}
+            ]
+            y_title = value_col
+        else:
+            traces = [{"x": series["x"], "y": series["count"], "type": "scatter", "mode": "lines", "name": "Contagem"}]
+            y_title = "Contagem"
+        
+        return {
+            "type": "timeseries",
+            "title": title,
+            "data": traces,
+            "layout": {
+                "title": title,
+                "xaxis": {"title": time_col},
+                "yaxis": {"title": y_title}
+            }
+        }
+    
+    @cached_chart
     def create_box_plot_data(self, column: str):
         """Cria dados para box plot"""
         if column not in self.df.columns:
@@ -434,63 +1299,937 @@ class DataAnalyzer:
             }
         }
 
-# Função para conversar com a IA
-async def ask_ai(question: str, dataset_info: Dict, conversation_history: List = None):
-    """Pergunta para a IA sobre os dados"""
-    try:
-        from groq import Groq
+# Estatísticas incrementais - permitem anexar dados sem recalcular tudo
+QUANTILE_SKETCH_SIZE = int(os.getenv("QUANTILE_SKETCH_SIZE", "2048"))
+
+class QuantileSketch:
+    """Resumo de quantis mesclável: centróides (valor, peso) ordenados e de tamanho limitado"""
+    
+    def __init__(self, values=None, weights=None, size: int = QUANTILE_SKETCH_SIZE):
+        import numpy as np
         
-        # Configurar cliente da Groq
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.size = size
+        self.values = np.empty(0) if values is None else values
+        self.weights = np.empty(0) if weights is None else weights
+    
+    @classmethod
+    def from_values(cls, values, size: int = QUANTILE_SKETCH_SIZE):
+        import numpy as np
+        
+        values = np.sort(values[~np.isnan(values)])
+        sketch = cls(values, np.ones(len(values)), size)
+        sketch._compress()
+        return sketch
+    
+    @property
+    def total(self) -> float:
+        return float(self.weights.sum())
+    
+    @property
+    def exact(self) -> bool:
+        """Sem compressão os quantis são exatos"""
+        return bool((self.weights == 1).all())
+    
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        import numpy as np
+        
+        values = np.concatenate([self.values, other.values])
+        weights = np.concatenate([self.weights, other.weights])
+        order = np.argsort(values, kind="mergesort")
+        merged = QuantileSketch(values[order], weights[order], self.size)
+        merged._compress()
+        return merged
+    
+    def _compress(self):
+        """Agrupa centróides vizinhos em no máximo `size` grupos de peso parecido"""
+        import numpy as np
+        
+        if len(self.values) <= self.size:
+            return
+        
+        cumulative = np.cumsum(self.weights) - self.weights
+        buckets = np.minimum((cumulative / self.total * self.size).astype(int), self.size - 1)
+        weights = np.bincount(buckets, weights=self.weights, minlength=self.size)
+        sums = np.bincount(buckets, weights=self.values * self.weights, minlength=self.size)
+        keep = weights > 0
+        self.weights = weights[keep]
+        self.values = sums[keep] / self.weights
+    
+    def quantile(self, q: float) -> float:
+        """Quantil com interpolação linear (igual ao pandas quando o sketch é exato)"""
+        if len(self.values) == 0:
+            return float("nan")
+        return float(self.quantiles([q])[0])
+    
+    def quantiles(self, qs) -> "np.ndarray":
+        """Vários quantis de uma vez"""
+        import numpy as np
         
-        # Montar contexto com informações do dataset
-        context = f"""
-        INFORMAÇÕES DO DATASET:
-        - Formato: {dataset_info.get('shape', 'N/A')}
-        - Colunas: {', '.join(dataset_info.get('columns', []))}
-        - Colunas Numéricas: {', '.join(dataset_info.get('numeric_columns', []))}
-        - Colunas Categóricas: {', '.join(dataset_info.get('categorical_columns', []))}
-        - Valores Ausentes: {dataset_info.get('missing_values', {})}
+        positions = np.cumsum(self.weights) - (self.weights + 1) / 2
+        return np.interp(np.asarray(qs) * (self.total - 1), positions, self.values)
+    
+    def count_outside(self, lower: float, upper: float) -> float:
+        """Quantidade de valores abaixo de lower ou acima de upper"""
+        return float(self.weights[(self.values < lower) | (self.values > upper)].sum())
+
+class IncrementalStats:
+    """Estado mesclável das estatísticas de uma sessão (momentos, co-momentos, quantis, frequências)
+    
+    Para as colunas numéricas guarda matrizes p x p calculadas sobre os pares de
+    linhas válidas (mesma semântica do DataFrame.corr do pandas):
+    n[i, j] pares válidos, mean[i, j] média da coluna i nesses pares,
+    m2[i, j] soma dos quadrados dos desvios da coluna i e comoment[i, j] o co-momento.
+    A diagonal dá count/mean/std de cada coluna. Anexar um bloco custa O(linhas do bloco).
+    """
+    
+    def __init__(self, columns: List[str], numeric_columns: List[str], categorical_columns: List[str]):
+        import numpy as np
+        
+        p = len(numeric_columns)
+        self.columns = columns
+        self.numeric_columns = numeric_columns
+        self.categorical_columns = categorical_columns
+        self.n_rows = 0
+        self.memory_bytes = 0
+        self.missing = {col: 0 for col in columns}
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))
+        self.m2 = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+        self.minimum = np.full(p, np.inf)
+        self.maximum = np.full(p, -np.inf)
+        self.sketches = [QuantileSketch() for _ in numeric_columns]
+        self.value_counts = {col: {} for col in categorical_columns}
+        # Tabelas de contingência por par de categóricas (somam entre blocos) e códigos globais dos níveis
+        self.level_codes = {col: {} for col in categorical_columns}
+        self.high_cardinality = set()  # colunas acima de CATEGORICAL_ASSOC_MAX_LEVELS: fora da matriz
+        self.pair_tables = {
+            (col_a, col_b): np.zeros((0, 0), dtype=np.int64)
+            for i, col_a in enumerate(categorical_columns) for col_b in categorical_columns[i + 1:]
+        }
+    
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame", numeric_columns: List[str], categorical_columns: List[str]):
+        stats = cls(df.columns.tolist(), numeric_columns, categorical_columns)
+        stats.update(df)
+        return stats
+    
+    def update(self, chunk: "pd.DataFrame"):
+        """Incorpora um bloco de linhas novas ao estado"""
+        self.n_rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(deep=True).sum())
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] += int(count)
         
-        PERGUNTA: {question}
-        """
+        if self.numeric_columns:
+            self._update_numeric(chunk[self.numeric_columns].to_numpy(dtype=float))
         
-        # Adicionar histórico recente da conversa
-        if conversation_history:
-            context += "\n\nCONVERSA RECENTE:\n"
-            for msg in conversation_history[-3:]:
-                context += f"- {msg.get('type', 'user')}: {msg.get('content', '')}\n"
+        for col in self.categorical_columns:
+            counts = self.value_counts[col]
+            for value, count in chunk[col].value_counts().items():
+                counts[value] = counts.get(value, 0) + int(count)
         
-        # Preparar mensagens para o modelo
-        messages = [
-            {
-                "role": "system",
-                "content": """Você é um analista de dados especializado em EDA.
-                
-                Sua função:
-                - Analisar dados e identificar padrões
-                - Detectar anomalias e outliers  
-                - Sugerir análises úteis
-                - Dar insights baseados nos dados
-                - Responder em português de forma clara
-                
-                IMPORTANTE: Como não temos visualizações disponíveis, foque em:
-                - Análises estatísticas
-                - Insights sobre correlações
-                - Identificação de padrões
-                - Sugestões de limpeza de dados
-                
-                Seja técnico mas acessível."""
-            },
-            {
-                "role": "user",
-                "content": context
-            }
+        if len(self.categorical_columns) > 1:
+            self._update_pair_tables(chunk)
+    
+    def _update_pair_tables(self, chunk: "pd.DataFrame"):
+        import numpy as np
+        import pandas as pd
+        
+        # Códigos do bloco traduzidos para códigos globais (níveis novos ganham o próximo código)
+        codes = {}
+        for col in self.categorical_columns:
+            if col in self.high_cardinality:
+                continue
+            local, uniques = pd.factorize(chunk[col])
+            mapping = self.level_codes[col]
+            # Limite checado com os níveis do bloco já somados, antes de alocar qualquer tabela
+            if len(uniques) > CATEGORICAL_ASSOC_MAX_LEVELS or \
+                    len(mapping) + sum(value not in mapping for value in uniques) > CATEGORICAL_ASSOC_MAX_LEVELS:
+                self.high_cardinality.add(col)
+                self.level_codes[col] = {}
+                continue
+            for value in uniques:
+                mapping.setdefault(value, len(mapping))
+            lookup = np.array([mapping[value] for value in uniques], dtype=np.int64)
+            codes[col] = np.where(local >= 0, lookup[np.maximum(local, 0)], -1)
+        
+        for (col_a, col_b), table in list(self.pair_tables.items()):
+            if col_a not in codes or col_b not in codes:
+                # Coluna passou do limite de níveis - o par sai da matriz, como no perfil completo
+                self.pair_tables.pop((col_a, col_b))
+                continue
+            k_a, k_b = len(self.level_codes[col_a]), len(self.level_codes[col_b])
+            grown = np.zeros((k_a, k_b), dtype=np.int64)
+            grown[:table.shape[0], :table.shape[1]] = table
+            a, b = codes[col_a], codes[col_b]
+            valid = (a >= 0) & (b >= 0)
+            grown += np.bincount(a[valid] * k_b + b[valid], minlength=k_a * k_b).reshape(k_a, k_b)
+            self.pair_tables[(col_a, col_b)] = grown
+    
+    def association_matrix(self) -> Dict:
+        """Mesmo resultado de CategoricalProfile.association_matrix, a partir das tabelas acumuladas"""
+        columns = [
+            col for col in self.categorical_columns
+            if col not in self.high_cardinality and len(self.level_codes[col]) > 1
         ]
+        skipped = [col for col in self.categorical_columns if col not in columns]
+        
+        cramers_v = {col: {col: 1.0} for col in columns}
+        chi_square = {}
+        for i, col_a in enumerate(columns):
+            for col_b in columns[i + 1:]:
+                v, chi2, dof, n = association_from_table(self.pair_tables[(col_a, col_b)])
+                cramers_v[col_a][col_b] = v
+                cramers_v[col_b][col_a] = v
+                chi_square[f"{col_a}|{col_b}"] = {"chi2": chi2, "dof": dof, "n": n}
+        
+        return {"cramers_v": cramers_v, "chi_square": chi_square, "skipped_columns": skipped}
+    
+    def _update_numeric(self, X):
+        import numpy as np
+        
+        valid = ~np.isnan(X)
+        
+        # Centraliza o bloco para reduzir cancelamento numérico (os momentos não mudam)
+        counts = valid.sum(axis=0)
+        shift = np.where(valid, X, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        X0 = np.where(valid, X - shift, 0.0)
+        V = valid.astype(float)
+        
+        # Todas as somas por par de colunas em poucas multiplicações de matriz
+        n_b = V.T @ V
+        sum_b = X0.T @ V                      # soma da coluna i nas linhas onde i e j são válidos
+        sumsq_b = (X0 ** 2).T @ V
+        cross_b = X0.T @ X0
+        
+        mean_b = np.divide(sum_b, n_b, out=np.zeros_like(sum_b), where=n_b > 0)
+        m2_b = sumsq_b - n_b * mean_b ** 2
+        comoment_b = cross_b - n_b * mean_b * mean_b.T
+        mean_b = mean_b + shift[:, None]
+        
+        # Mescla com o estado atual (fórmulas de Chan et al.)
+        n_a = self.n
+        n = n_a + n_b
+        weight = np.divide(n_a * n_b, n, out=np.zeros_like(n), where=n > 0)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+        self.m2 = self.m2 + m2_b + delta ** 2 * weight
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.n = n
+        
+        has_values = valid.any(axis=0)
+        chunk_min = np.where(has_values, np.min(np.where(valid, X, np.inf), axis=0), np.inf)
+        chunk_max = np.where(has_values, np.max(np.where(valid, X, -np.inf), axis=0), -np.inf)
+        self.minimum = np.minimum(self.minimum, chunk_min)
+        self.maximum = np.maximum(self.maximum, chunk_max)
+        
+        for i in range(X.shape[1]):
+            self.sketches[i] = self.sketches[i].merge(QuantileSketch.from_values(X[:, i]))
+    
+    def basic_info(self, dtypes: Dict) -> Dict:
+        return {
+            "shape": (self.n_rows, len(self.columns)),
+            "columns": self.columns,
+            "dtypes": dtypes,
+            "missing_values": dict(self.missing),
+            "numeric_columns": self.numeric_columns,
+            "categorical_columns": self.categorical_columns,
+            "memory_usage": f"{self.memory_bytes / 1024**2:.2f} MB"
+        }
+    
+    def descriptive_stats(self) -> Dict:
+        import numpy as np
         
-        # Chamar a API da Groq
-        completion = client.chat.completions.create(
-            model="deepseek-r1-distill-llama-70b",
+        stats = {}
+        
+        if self.numeric_columns:
+            numeric = {}
+            for i, col in enumerate(self.numeric_columns):
+                count = self.n[i, i]
+                sketch = self.sketches[i]
+                numeric[col] = {
+                    "count": float(count),
+                    "mean": float(self.mean[i, i]) if count else float("nan"),
+                    "std": float(np.sqrt(self.m2[i, i] / (count - 1))) if count > 1 else float("nan"),
+                    "min": float(self.minimum[i]) if count else float("nan"),
+                    "25%": sketch.quantile(0.25),
+                    "50%": sketch.quantile(0.5),
+                    "75%": sketch.quantile(0.75),
+                    "max": float(self.maximum[i]) if count else float("nan")
+                }
+            stats["numeric"] = numeric
+        
+        if self.categorical_columns:
+            categorical = {}
+            for col in self.categorical_columns:
+                counts = self.value_counts[col]
+                categorical[col] = categorical_stats_from_counts(
+                    np.array(list(counts), dtype=object), np.array(list(counts.values()), dtype=np.int64)
+                )
+            stats["categorical"] = categorical
+        
+        return stats
+    
+    def distributions(self) -> Dict:
+        import numpy as np
+        
+        grid = np.linspace(0, 1, DISTRIBUTION_QUANTILES)
+        return {
+            "numeric": {
+                col: numeric_distribution(sketch.total, sketch.quantiles(grid) if len(sketch.values) else [])
+                for col, sketch in zip(self.numeric_columns, self.sketches)
+            },
+            "categorical": {
+                col: categorical_distribution(
+                    np.array(list(counts), dtype=object), np.array(list(counts.values()), dtype=np.int64)
+                )
+                for col, counts in self.value_counts.items()
+            }
+        }
+    
+    def outliers_info(self) -> Dict:
+        outliers_info = {}
+        
+        for col, sketch in zip(self.numeric_columns, self.sketches):
+            Q1 = sketch.quantile(0.25)
+            Q3 = sketch.quantile(0.75)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
+            count = sketch.count_outside(lower_bound, upper_bound)
+            
+            outliers_info[col] = {
+                "count": int(round(count)),
+                "percentage": (count / self.n_rows) * 100 if self.n_rows else 0.0,
+                "bounds": {"lower": lower_bound, "upper": upper_bound},
+                "approximate": not sketch.exact
+            }
+        
+        return outliers_info
+    
+    def correlation_matrix(self) -> Dict:
+        import numpy as np
+        
+        if len(self.numeric_columns) < 2:
+            return {}
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        
+        return {
+            col_j: {col_i: float(corr[i, j]) for i, col_i in enumerate(self.numeric_columns)}
+            for j, col_j in enumerate(self.numeric_columns)
+        }
+
+# Amostragem para datasets grandes - gráficos e estatísticas rápidas usam a amostra
+SAMPLING_THRESHOLD_ROWS = int(os.getenv("SAMPLING_THRESHOLD_ROWS", "200000"))
+SAMPLING_SIZE = int(os.getenv("SAMPLING_SIZE", "50000"))
+SAMPLING_MAX_STRATA = int(os.getenv("SAMPLING_MAX_STRATA", "50"))
+
+class SessionSample:
+    """Amostra por reservatório (Algoritmo R), opcionalmente estratificada por uma coluna
+    
+    Cada estrato tem seu próprio reservatório com a mesma capacidade (alocação igual),
+    então classes raras como fraude ficam bem representadas; os pesos N_h / n_h
+    corrigem as estimativas. Novos blocos (append) atualizam o reservatório em O(bloco).
+    """
+    
+    def __init__(self, capacity: int = SAMPLING_SIZE, stratify_column: Optional[str] = None, seed: int = 42):
+        import numpy as np
+        
+        self.capacity = capacity
+        self.stratify_column = stratify_column
+        self.rng = np.random.default_rng(seed)
+        self.per_stratum = capacity
+        self.population = 0
+        self.strata = {}  # estrato -> {"seen": N_h, "ids": posições globais, "rows": DataFrame}
+        self._frame = None
+        self._intervals = None
+    
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame", capacity: int = SAMPLING_SIZE, stratify_column: Optional[str] = None):
+        sample = cls(capacity, stratify_column)
+        if stratify_column:
+            n_strata = df[stratify_column].nunique(dropna=False)
+            if n_strata > SAMPLING_MAX_STRATA:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Coluna {stratify_column} tem {n_strata} valores - máximo para estratificar é {SAMPLING_MAX_STRATA}"
+                )
+            sample.per_stratum = max(capacity // max(n_strata, 1), 1)
+        sample.update(df)
+        return sample
+    
+    def _stratum_keys(self, chunk: "pd.DataFrame"):
+        if not self.stratify_column:
+            return {"__all__": chunk}
+        keys = chunk[self.stratify_column].astype(object).where(chunk[self.stratify_column].notna(), "<NA>")
+        return {key: rows for key, rows in chunk.groupby(keys.to_numpy(), sort=False)}
+    
+    def update(self, chunk: "pd.DataFrame"):
+        """Passa um bloco de linhas novas pelos reservatórios"""
+        import numpy as np
+        import pandas as pd
+        
+        # Índice = posição global da linha, usado para identificar os itens do reservatório
+        chunk = chunk.set_axis(pd.RangeIndex(self.population, self.population + len(chunk)))
+        self.population += len(chunk)
+        
+        for key, rows in self._stratum_keys(chunk).items():
+            stratum = self.strata.setdefault(key, {"seen": 0, "ids": np.empty(0, dtype=np.int64), "rows": rows.iloc[:0]})
+            k = self.per_stratum
+            seen = stratum["seen"]
+            positions = seen + np.arange(len(rows))
+            
+            # Algoritmo R vetorizado: o t-ésimo item entra no slot j ~ U[0, t] se j < k
+            slots = np.where(positions < k, positions, self.rng.integers(0, positions + 1))
+            accepted = slots < k
+            slots, new_ids = slots[accepted], rows.index.to_numpy()[accepted]
+            
+            # Em slots repetidos vale o último item (mesma semântica do algoritmo sequencial)
+            last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+            ids = np.concatenate([stratum["ids"], np.full(max(0, min(k, seen + len(rows)) - len(stratum["ids"])), -1)])
+            ids[slots[last]] = new_ids[last]
+            
+            pool = pd.concat([stratum["rows"], rows.loc[new_ids[last]]])
+            stratum.update({"seen": seen + len(rows), "ids": ids, "rows": pool.loc[np.sort(ids)]})
+        
+        self._frame = None
+        self._intervals = None
+    
+    @property
+    def frame(self) -> "pd.DataFrame":
+        """DataFrame com as linhas amostradas, na ordem original"""
+        if self._frame is None:
+            import pandas as pd
+            
+            self._frame = pd.concat([s["rows"] for s in self.strata.values()]).sort_index()
+        return self._frame
+    
+    def metadata(self) -> Dict:
+        return {
+            "sampled": True,
+            "method": "stratified_reservoir" if self.stratify_column else "reservoir",
+            "stratify_column": self.stratify_column,
+            "sample_size": len(self.frame),
+            "population_size": self.population,
+            "strata": {
+                str(key): {"population": s["seen"], "sample": len(s["rows"])}
+                for key, s in self.strata.items()
+            } if self.stratify_column else None
+        }
+    
+    def confidence_intervals(self, columns: List[str], z: float = 1.96) -> Dict:
+        """IC 95% das médias pelo estimador estratificado (com correção de população finita)"""
+        import numpy as np
+        
+        if self._intervals is not None:
+            return self._intervals
+        
+        means, variances, counts, populations = [], [], [], []
+        for s in self.strata.values():
+            values = s["rows"][columns]
+            means.append(values.mean().to_numpy())
+            variances.append(values.var().fillna(0).to_numpy())
+            counts.append(values.count().to_numpy())
+            populations.append(s["seen"])
+        
+        means, variances, counts = np.array(means), np.array(variances), np.array(counts, dtype=float)
+        W = (np.array(populations, dtype=float) / self.population)[:, None]
+        N_h = np.array(populations, dtype=float)[:, None]
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(W * means, axis=0)
+            fpc = np.clip(1 - counts / N_h, 0, 1)
+            var = np.nansum(np.where(counts > 0, W ** 2 * fpc * variances / counts, 0), axis=0)
+        half = z * np.sqrt(var)
+        
+        # Colunas sem valores na amostra ficam sem intervalo (NaN não é JSON válido)
+        self._intervals = {
+            col: {"mean": float(mean[i]), "lower": float(mean[i] - half[i]), "upper": float(mean[i] + half[i])}
+            if counts[:, i].sum() > 0 else None
+            for i, col in enumerate(columns)
+        }
+        return self._intervals
+
+def get_sampling_info(session_data: Dict) -> Dict:
+    """Metadados de amostragem (e ICs) que acompanham as respostas da sessão"""
+    sample = session_data.get("sample")
+    if sample is None:
+        return {"sampled": False}
+    
+    info = sample.metadata()
+    info["profile_source"] = session_data.get("profile_source", "sample")
+    info["recompute_status"] = session_data.get("recompute_status", "idle")
+    info["confidence_level"] = 0.95
+    info["confidence_intervals"] = sample.confidence_intervals(session_data["basic_info"]["numeric_columns"])
+    return info
+
+# Análise de variável alvo - relevância de todas as features em passadas vetorizadas
+TARGET_MAX_CLASSES = int(os.getenv("TARGET_MAX_CLASSES", "20"))
+TARGET_BINS = int(os.getenv("TARGET_BINS", "20"))
+TARGET_BLOCK_ROWS = int(os.getenv("TARGET_BLOCK_ROWS", "100000"))
+
+def _finite(value):
+    """float nativo, ou None para NaN/inf (JSON não aceita)"""
+    value = float(value)
+    return value if value == value and abs(value) != float("inf") else None
+
+def _mutual_information(joint) -> "np.ndarray":
+    """Informação mútua (nats) a partir de tabelas conjuntas (..., bins, classes)"""
+    import numpy as np
+    
+    joint = joint.astype(float)
+    total = joint.sum(axis=(-2, -1), keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_xy = joint / total
+        p_x = p_xy.sum(axis=-1, keepdims=True)
+        p_y = p_xy.sum(axis=-2, keepdims=True)
+        terms = np.where(p_xy > 0, p_xy * np.log(p_xy / (p_x * p_y)), 0.0)
+    return terms.sum(axis=(-2, -1))
+
+def compute_target_analysis(df: "pd.DataFrame", target: str, numeric_columns: List[str],
+                            categorical_columns: List[str], bins: int = TARGET_BINS) -> Dict:
+    """Relevância de cada feature para o alvo
+    
+    Classificação (alvo categórico ou com até TARGET_MAX_CLASSES valores): médias e
+    desvios por classe, F da ANOVA e correlação ponto-bisserial (alvo binário).
+    Regressão: correlação de Pearson e F da regressão. Nos dois casos, informação mútua
+    a partir de histogramas conjuntos. As features numéricas são processadas juntas, em
+    blocos de linhas: somas por classe são produtos de matriz (one-hot^T @ X) e todos os
+    histogramas conjuntos saem de um único bincount por bloco.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    if target not in df.columns:
+        raise HTTPException(status_code=400, detail=f"Coluna {target} não existe no dataset")
+    
+    df = df[df[target].notna()]
+    if df.empty:
+        raise HTTPException(status_code=400, detail=f"Coluna {target} não tem valores")
+    
+    target_series = df[target]
+    is_numeric_target = pd.api.types.is_numeric_dtype(target_series) and not pd.api.types.is_bool_dtype(target_series)
+    task = "regression" if is_numeric_target and target_series.nunique() > TARGET_MAX_CLASSES else "classification"
+    if task == "classification" and target_series.nunique() > TARGET_MAX_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Alvo {target} tem mais de {TARGET_MAX_CLASSES} classes")
+    
+    features = [col for col in numeric_columns if col != target]
+    X = df[features].to_numpy(dtype=float)
+    n, p = X.shape
+    
+    if task == "classification":
+        y, classes = pd.factorize(target_series, sort=True)
+        y_values = None
+    else:
+        y_values = target_series.to_numpy(dtype=float)
+        # Alvo contínuo discretizado em faixas iguais para a informação mútua
+        y_min, y_max = y_values.min(), y_values.max()
+        span = (y_max - y_min) or 1.0
+        y = np.minimum(((y_values - y_min) / span * bins).astype(np.int64), bins - 1)
+        classes = None
+    k = int(y.max()) + 1
+    
+    # Faixas de cada feature (min/max ignorando NaN) para o histograma
+    valid_any = ~np.isnan(X)
+    with np.errstate(invalid="ignore"):
+        x_min = np.where(valid_any.any(axis=0), np.nanmin(np.where(valid_any, X, np.inf), axis=0), 0.0)
+        x_max = np.where(valid_any.any(axis=0), np.nanmax(np.where(valid_any, X, -np.inf), axis=0), 0.0)
+    x_span = np.where(x_max > x_min, x_max - x_min, 1.0)
+    
+    count = np.zeros((k, p))
+    sum1 = np.zeros((k, p))
+    sum2 = np.zeros((k, p))
+    joint = np.zeros(p * bins * k)
+    cross = np.zeros(p)  # regressão: soma de x*y nas linhas válidas
+    sum_y = np.zeros(p)
+    sum_y2 = np.zeros(p)
+    feature_offset = (np.arange(p) * bins * k)[None, :]
+    
+    for start in range(0, n, TARGET_BLOCK_ROWS):
+        Xb = X[start:start + TARGET_BLOCK_ROWS]
+        yb = y[start:start + TARGET_BLOCK_ROWS]
+        Vb = ~np.isnan(Xb)
+        X0 = np.where(Vb, Xb, 0.0)
+        
+        onehot = np.zeros((len(yb), k))
+        onehot[np.arange(len(yb)), yb] = 1.0
+        count += onehot.T @ Vb
+        sum1 += onehot.T @ X0
+        sum2 += onehot.T @ (X0 ** 2)
+        
+        binned = np.minimum(((X0 - x_min) / x_span * bins).astype(np.int64), bins - 1)
+        codes = feature_offset + binned * k + yb[:, None]
+        joint += np.bincount(codes[Vb], minlength=p * bins * k)
+        
+        if y_values is not None:
+            yv = y_values[start:start + TARGET_BLOCK_ROWS][:, None]
+            cross += (X0 * yv).sum(axis=0)
+            sum_y += (Vb * yv).sum(axis=0)
+            sum_y2 += (Vb * yv ** 2).sum(axis=0)
+    
+    mutual_info = _mutual_information(joint.reshape(p, bins, k))
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n_f = count.sum(axis=0)
+        mean_f = sum1.sum(axis=0) / n_f
+        class_mean = sum1 / count
+        class_std = np.sqrt((sum2 - count * class_mean ** 2) / (count - 1))
+        ss_within = np.nansum(sum2 - count * class_mean ** 2, axis=0)
+        ss_total = sum2.sum(axis=0) - n_f * mean_f ** 2
+        
+        if task == "classification":
+            k_f = (count > 0).sum(axis=0)
+            ss_between = ss_total - ss_within
+            f_score = (ss_between / (k_f - 1)) / (ss_within / (n_f - k_f))
+            if k == 2:
+                # Ponto-bisserial = Pearson entre a feature e o alvo 0/1
+                n0, n1 = count
+                association = (class_mean[1] - class_mean[0]) * np.sqrt(n0 * n1) / n_f / np.sqrt(ss_total / n_f)
+            else:
+                association = np.full(p, np.nan)
+        else:
+            cov = cross - sum1.sum(axis=0) * sum_y / n_f
+            var_y = sum_y2 - sum_y ** 2 / n_f
+            association = cov / np.sqrt(ss_total * var_y)
+            f_score = association ** 2 / (1 - association ** 2) * (n_f - 2)
+    
+    rows = []
+    for i, col in enumerate(features):
+        row = {
+            "feature": col,
+            "type": "numeric",
+            "mutual_information": _finite(mutual_info[i]),
+            "f_score": _finite(f_score[i]),
+            ("point_biserial" if task == "classification" else "correlation"): _finite(association[i])
+        }
+        if task == "classification":
+            row["class_means"] = {str(_to_python(c)): _finite(class_mean[j, i]) for j, c in enumerate(classes)}
+            row["class_std"] = {str(_to_python(c)): _finite(class_std[j, i]) for j, c in enumerate(classes)}
+        rows.append(row)
+    
+    # Categóricas: informação mútua com os bins-1 níveis mais frequentes + "outros"
+    for col in categorical_columns:
+        if col == target:
+            continue
+        codes, uniques = pd.factorize(df[col])
+        valid = codes >= 0
+        rank = np.empty(len(uniques), dtype=np.int64)
+        rank[np.argsort(-np.bincount(codes[valid], minlength=len(uniques)), kind="stable")] = np.arange(len(uniques))
+        grouped = np.minimum(rank[codes[valid]], bins - 1)
+        table = np.bincount(grouped * k + y[valid], minlength=bins * k).reshape(bins, k)
+        rows.append({
+            "feature": col,
+            "type": "categorical",
+            "mutual_information": _finite(_mutual_information(table)),
+            "f_score": None
+        })
+    
+    rows.sort(key=lambda row: -(row["mutual_information"] or 0.0))
+    for rank_position, row in enumerate(rows, start=1):
+        row["rank"] = rank_position
+    
+    analysis = {
+        "target": target,
+        "task": task,
+        "n_rows": int(len(df)),
+        "bins": bins,
+        "features": rows
+    }
+    if task == "classification":
+        class_counts = np.bincount(y, minlength=k)
+        analysis["classes"] = {str(_to_python(c)): int(class_counts[j]) for j, c in enumerate(classes)}
+    
+    return analysis
+
+async def get_target_analysis(session_data: Dict, target: str) -> Dict:
+    """Análise do alvo com cache por (sessão, alvo); appends invalidam o cache"""
+    analysis = session_data.get("target_analyses", {}).get(target)
+    if analysis is not None:
+        return analysis
+    
+    # O frame é montado aqui no event loop: juntar os blocos pendentes numa thread
+    # correria com um /append e perderia o bloco anexado no meio do concat
+    df = get_session_frame(session_data)
+    basic_info = session_data["basic_info"]
+    version = session_data.get("updated_at")
+    analysis = await asyncio.to_thread(
+        compute_target_analysis, df, target, basic_info["numeric_columns"], basic_info["categorical_columns"]
+    )
+    
+    # Um append durante o cálculo invalida o resultado - não guarda no cache
+    if session_data.get("updated_at") == version:
+        session_data.setdefault("target_analyses", {})[target] = analysis
+    return analysis
+
+def create_feature_relevance_chart(analysis: Dict, limit: int = 15) -> Dict:
+    """Cria dados para gráfico de barras com a relevância (informação mútua) das features"""
+    features = [row for row in analysis["features"] if row["mutual_information"] is not None][:limit]
+    title = f"Relevância das variáveis para {analysis['target']} (informação mútua)"
+    
+    return {
+        "type": "bar",
+        "title": title,
+        "data": {
+            "x": [row["mutual_information"] for row in features][::-1],
+            "y": [row["feature"] for row in features][::-1],
+            "type": "bar",
+            "orientation": "h",
+            "name": "Informação mútua"
+        },
+        "layout": {
+            "title": title,
+            "xaxis": {"title": "Informação mútua (nats)"},
+            "yaxis": {"title": ""}
+        }
+    }
+
+# Prefixo das respostas de erro da IA (não devem ser cacheadas)
+AI_ERROR_PREFIX = "Desculpe, tive um problema ao analisar sua pergunta"
+
+# Prompt da IA com orçamento fixo de tokens (sistema + contexto)
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "2000"))
+AI_HISTORY_MESSAGES = 3
+AI_HISTORY_MESSAGE_TOKENS = 200
+AI_CHARS_PER_TOKEN = 3  # estimativa conservadora (o tokenizer do modelo não é dependência)
+
+AI_SYSTEM_PROMPT = """Você é um analista de dados especializado em EDA.
+
+Sua função:
+- Analisar dados e identificar padrões
+- Detectar anomalias e outliers
+- Sugerir análises úteis
+- Dar insights baseados nos dados
+- Responder em português de forma clara
+
+IMPORTANTE: Como não temos visualizações disponíveis, foque em:
+- Análises estatísticas
+- Insights sobre correlações
+- Identificação de padrões
+- Sugestões de limpeza de dados
+
+Seja técnico mas acessível."""
+
+_THINK_BLOCK = re.compile(r"<think>.*?(?:</think>|$)", re.DOTALL)
+_NUMBERED_COLUMN = re.compile(r"^(.*?)(\d+)$")
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // AI_CHARS_PER_TOKEN)
+
+def strip_reasoning(text: str) -> str:
+    """Remove os blocos <think> do modelo de raciocínio"""
+    return _THINK_BLOCK.sub("", text or "").strip()
+
+def compact_columns(columns: List[str]) -> str:
+    """Agrupa colunas numeradas em sequência (V1, V2, ..., V28 -> V1..V28)"""
+    parts = []
+    run = []  # (prefixo, número, nome) da sequência atual
+    
+    def flush():
+        if len(run) > 2:
+            parts.append(f"{run[0][2]}..{run[-1][2]}")
+        else:
+            parts.extend(name for _, _, name in run)
+        run.clear()
+    
+    for col in columns:
+        match = _NUMBERED_COLUMN.match(str(col))
+        if match and run and match.group(1) == run[-1][0] and int(match.group(2)) == run[-1][1] + 1:
+            run.append((match.group(1), int(match.group(2)), str(col)))
+            continue
+        flush()
+        if match:
+            run.append((match.group(1), int(match.group(2)), str(col)))
+        else:
+            parts.append(str(col))
+    flush()
+    
+    return ", ".join(parts)
+
+def _fmt(value) -> str:
+    return "N/A" if value is None else f"{value:.4g}"
+
+class PromptBuilder:
+    """Monta o contexto da IA dentro de um orçamento de tokens
+    
+    Seções são preenchidas por prioridade, linha a linha, até o orçamento acabar;
+    o texto final segue a ordem de exibição. Seções que não cabem são truncadas
+    ou descartadas e aparecem no relatório.
+    """
+    
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.sections = []  # (ordem, prioridade, título, linhas)
+    
+    def add(self, title: str, lines: List[str], priority: int, order: int):
+        if lines:
+            self.sections.append((order, priority, title, lines))
+    
+    def build(self) -> Dict:
+        remaining = self.budget
+        rendered = {}
+        report = {}
+        
+        for order, priority, title, lines in sorted(self.sections, key=lambda section: section[1]):
+            header = f"{title}:\n"
+            if estimate_tokens(header) >= remaining:
+                report[title] = 0
+                continue
+            remaining -= estimate_tokens(header)
+            
+            kept = []
+            for line in lines:
+                cost = estimate_tokens(line + "\n")
+                if cost > remaining:
+                    # Corta a linha que não cabe e encerra a seção
+                    room = (remaining - 1) * AI_CHARS_PER_TOKEN
+                    if room > 20:
+                        kept.append(line[:room - 1] + "…")
+                        remaining -= estimate_tokens(kept[-1] + "\n")
+                    break
+                kept.append(line)
+                remaining -= cost
+            
+            rendered[order] = header + "\n".join(kept)
+            report[title] = len(kept) if len(kept) == len(lines) else f"{len(kept)}/{len(lines)}"
+        
+        content = "\n\n".join(rendered[order] for order in sorted(rendered))
+        return {"content": content, "sections": report}
+
+def build_ai_prompt(question: str, dataset_info: Dict, conversation_history: List = None,
+                    session_data: Dict = None, budget: int = AI_PROMPT_TOKEN_BUDGET) -> Dict:
+    """Contexto compacto para a IA: schema resumido, estatísticas relevantes à pergunta
+    e histórico recente sem raciocínio, dentro de `budget` tokens (contando o sistema)"""
+    session_data = session_data or {}
+    question_lower = question.lower()
+    builder = PromptBuilder(budget - estimate_tokens(AI_SYSTEM_PROMPT))
+    
+    # Pergunta - nunca ocupa mais que um quarto do orçamento
+    question_room = budget // 4 * AI_CHARS_PER_TOKEN
+    builder.add("PERGUNTA", [question if len(question) <= question_room else question[:question_room - 1] + "…"],
+                priority=0, order=90)
+    
+    # Schema compacto
+    columns = dataset_info.get("columns", [])
+    numeric = dataset_info.get("numeric_columns", [])
+    categorical = dataset_info.get("categorical_columns", [])
+    time_columns = dataset_info.get("time_columns", {})
+    shape = dataset_info.get("shape", ["N/A", "N/A"])
+    n_rows = shape[0] if isinstance(shape[0], int) else 0
+    schema = [f"{shape[0]} linhas x {shape[1]} colunas"]
+    if numeric:
+        schema.append(f"Numéricas ({len(numeric)}): {compact_columns(numeric)}")
+    if categorical:
+        schema.append(f"Categóricas ({len(categorical)}): {compact_columns(categorical)}")
+    if time_columns:
+        schema.append(f"Temporais: {', '.join(time_columns)}")
+    other = [col for col in columns if col not in set(numeric) | set(categorical)]
+    if other:
+        schema.append(f"Outras ({len(other)}): {compact_columns(other)}")
+    missing = {col: count for col, count in dataset_info.get("missing_values", {}).items() if count}
+    if missing:
+        ranked = sorted(missing.items(), key=lambda item: -item[1])
+        schema.append("Ausentes: " + ", ".join(
+            f"{col}={count}" + (f" ({count / n_rows:.1%})" if n_rows else "") for col, count in ranked
+        ))
+    else:
+        schema.append("Ausentes: nenhum")
+    builder.add("DATASET", schema, priority=1, order=10)
+    
+    # Estatísticas pré-calculadas escolhidas pela pergunta
+    descriptive = (session_data.get("descriptive_stats") or {}).get("numeric", {})
+    mentioned = [col for col in columns if re.search(rf"(?<!\w){re.escape(str(col).lower())}(?!\w)", question_lower)]
+    stats_lines = []
+    for col in mentioned:
+        stats = descriptive.get(col)
+        if stats:
+            stats_lines.append(
+                f"{col}: média {_fmt(stats.get('mean'))}, dp {_fmt(stats.get('std'))}, "
+                f"min {_fmt(stats.get('min'))}, mediana {_fmt(stats.get('50%'))}, max {_fmt(stats.get('max'))}"
+            )
+    builder.add("ESTATÍSTICAS DAS COLUNAS CITADAS", stats_lines, priority=2, order=20)
+    
+    outliers = session_data.get("outliers_info") or {}
+    if outliers and any(word in question_lower for word in ("outlier", "anomal", "atípic", "extrem")):
+        ranked = sorted(outliers.items(), key=lambda item: -item[1]["count"])
+        builder.add("OUTLIERS (IQR)", [
+            f"{col}: {info['count']} ({info['percentage']:.1f}%)" for col, info in ranked if info["count"]
+        ], priority=3, order=30)
+    
+    correlations = session_data.get("correlation_matrix") or {}
+    if correlations and any(word in question_lower for word in ("correla", "relação", "relacion")):
+        pairs = sorted(
+            {tuple(sorted((a, b))): r for a in correlations for b, r in correlations[a].items()
+             if a != b and r is not None}.items(),
+            key=lambda item: -abs(item[1])
+        )
+        builder.add("CORRELAÇÕES MAIS FORTES", [f"{a} x {b}: {r:.2f}" for (a, b), r in pairs[:15]],
+                    priority=3, order=40)
+    
+    missingness = session_data.get("missingness") or {}
+    if missing and missingness and any(word in question_lower for word in ("ausente", "nulo", "faltant", "missing", "vazio")):
+        builder.add("VALORES AUSENTES", [
+            f"Linhas completas: {missingness.get('complete_rows')} de {missingness.get('total_rows')}"
+        ], priority=3, order=50)
+    
+    target = session_data.get("target")
+    analysis = (session_data.get("target_analyses") or {}).get(target)
+    if analysis and any(word in question_lower for word in ("alvo", "target", "relevân", "importân", "importante", target.lower())):
+        builder.add(f"RELEVÂNCIA PARA {target}", [
+            f"{row['feature']}: informação mútua {_fmt(row['mutual_information'])}" for row in analysis["features"][:10]
+        ], priority=3, order=60)
+    
+    builder.add("INSIGHTS", list(session_data.get("insights") or []), priority=5, order=70)
+    
+    # Histórico recente sem o raciocínio (<think>) do modelo
+    history_lines = []
+    history_room = AI_HISTORY_MESSAGE_TOKENS * AI_CHARS_PER_TOKEN
+    for msg in (conversation_history or [])[-AI_HISTORY_MESSAGES:]:
+        content = strip_reasoning(msg.get("content", "")).replace("\n", " ")
+        if len(content) > history_room:
+            content = content[:history_room - 1] + "…"
+        if content:
+            history_lines.append(f"- {msg.get('type', 'user')}: {content}")
+    builder.add("CONVERSA RECENTE", history_lines, priority=4, order=80)
+    
+    prompt = builder.build()
+    prompt["estimated_tokens"] = estimate_tokens(AI_SYSTEM_PROMPT) + estimate_tokens(prompt["content"])
+    prompt["budget"] = budget
+    return prompt
+
+# Função para conversar com a IA
+async def ask_ai(question: str, dataset_info: Dict, conversation_history: List = None,
+                 prompt: Dict = None) -> str:
+    """Pergunta para a IA sobre os dados (prompt pronto de build_ai_prompt é opcional)"""
+    try:
+        from groq import Groq
+        
+        # Configurar cliente da Groq
+        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        
+        # Montar contexto compacto dentro do orçamento de tokens
+        if prompt is None:
+            prompt = build_ai_prompt(question, dataset_info, conversation_history)
+        logger.info(f"🧾 Prompt da IA: ~{prompt['estimated_tokens']}/{prompt['budget']} tokens - {prompt['sections']}")
+        
+        # Preparar mensagens para o modelo
+        messages = [
+            {
+                "role": "system",
+                "content": AI_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt["content"]
+            }
+        ]
+        
+        # Chamar a API da Groq
+        completion = client.chat.completions.create(
+            model="deepseek-r1-distill-llama-70b",
             messages=messages,
             temperature=0.6,
             max_completion_tokens=4096,
@@ -505,7 +2244,709 @@ async def ask_ai(question: str, dataset_info: Dict, conversation_history: List =
         
     except Exception as e:
         logger.error(f"Erro na IA: {e}")
-        return f"Desculpe, tive um problema ao analisar sua pergunta: {str(e)}"
+        return f"{AI_ERROR_PREFIX}: {str(e)}"
+
+def read_csv_bytes(contents: bytes) -> "pd.DataFrame":
+    """Lê o conteúdo de um CSV enviado tentando diferentes encodings"""
+    import pandas as pd
+    
+    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+    
+    for encoding in encodings:
+        try:
+            df = pd.read_csv(io.StringIO(contents.decode(encoding)))
+            logger.info(f"CSV lido com encoding: {encoding}")
+            return df
+        except UnicodeDecodeError:
+            continue
+        except Exception as e:
+            logger.error(f"Erro com {encoding}: {e}")
+            continue
+    
+    return None
+
+def build_dataset_profile(analyzer: DataAnalyzer) -> Dict:
+    """Roda o pipeline completo de análise e retorna os artefatos da sessão"""
+    outliers_info = analyzer.find_outliers()
+    correlation_matrix = analyzer.get_correlations()
+    return {
+        "basic_info": analyzer.get_basic_info(),
+        "descriptive_stats": analyzer.get_descriptive_stats(),
+        "outliers_info": outliers_info,
+        "correlation_matrix": correlation_matrix,
+        "insights": analyzer.generate_insights(outliers_info, correlation_matrix),
+        "missingness": analyzer.missingness.summary(),
+        "categorical_associations": analyzer.categorical.association_matrix(),
+        "distributions": analyzer.get_distributions()
+    }
+
+def get_session_frame(session_data: Dict) -> "pd.DataFrame":
+    """DataFrame completo da sessão, juntando os blocos anexados pendentes em um único concat"""
+    pending = session_data.get("pending_chunks")
+    if pending:
+        import pandas as pd
+        
+        session_data["dataframe"] = pd.concat([session_data["dataframe"], *pending], ignore_index=True)
+        session_data["pending_chunks"] = []
+        if session_data.get("sample") is None:
+            session_data["analyzer"] = DataAnalyzer(session_data["dataframe"])
+    
+    return session_data["dataframe"]
+
+def get_session_analyzer(session_data: Dict) -> DataAnalyzer:
+    """Analisador usado nos gráficos: sobre a amostra em sessões amostradas, senão sobre os dados completos"""
+    if session_data.get("sample") is None:
+        get_session_frame(session_data)
+    return session_data["analyzer"]
+
+def get_missingness_index(session_data: Dict) -> MissingnessIndex:
+    """Índice de ausentes da sessão (montado sob demanda para sessões antigas/de exemplo)"""
+    index = session_data.get("missingness_index")
+    if index is None:
+        index = MissingnessIndex.from_frame(get_session_frame(session_data))
+        session_data["missingness_index"] = index
+    return index
+
+def build_session_data(df: "pd.DataFrame", stratify_column: Optional[str] = None) -> Dict:
+    """Analisa um DataFrame novo; acima de SAMPLING_THRESHOLD_ROWS o perfil vem de uma amostra"""
+    parse_datetime_columns(df)
+    
+    if len(df) <= SAMPLING_THRESHOLD_ROWS:
+        analyzer = DataAnalyzer(df)
+        return {
+            "dataframe": df,
+            "analyzer": analyzer,
+            **build_dataset_profile(analyzer),
+            "missingness_index": analyzer.missingness
+        }
+    
+    if stratify_column and stratify_column not in df.columns:
+        raise HTTPException(status_code=400, detail=f"Coluna {stratify_column} não existe no dataset")
+    
+    sample = SessionSample.from_frame(df, stratify_column=stratify_column)
+    analyzer = DataAnalyzer(sample.frame)
+    
+    # A amostra estratificada tem a mesma capacidade por estrato (classes raras super-representadas):
+    # serve para os gráficos, mas as estatísticas guardadas vêm de um reservatório simples
+    profile_frame = SessionSample.from_frame(df).frame if stratify_column else sample.frame
+    profile = build_dataset_profile(DataAnalyzer(profile_frame))
+    
+    # Informações básicas e ausentes são baratos, então vêm dos dados completos
+    full_analyzer = DataAnalyzer(df)
+    profile["basic_info"] = full_analyzer.get_basic_info()
+    profile["missingness"] = full_analyzer.missingness.summary()
+    profile["missingness_index"] = full_analyzer.missingness
+    # Distribuições dos dados completos - a amostra estratificada distorce as proporções
+    profile["distributions"] = full_analyzer.get_distributions()
+    logger.info(f"🎲 Dataset com {len(df)} linhas - usando amostra de {len(sample.frame)} linhas")
+    
+    return {
+        "dataframe": df,
+        "analyzer": analyzer,
+        "sample": sample,
+        "profile_source": "sample",
+        **profile
+    }
+
+async def recompute_exact_profile(session_id: str):
+    """Recalcula o perfil com todos os dados em background e publica o resultado na sessão"""
+    session_data = datasets_storage.get(session_id)
+    if session_data is None:
+        return
+    
+    try:
+        df = get_session_frame(session_data)
+        profile = await asyncio.to_thread(build_dataset_profile, DataAnalyzer(df))
+        
+        if datasets_storage.get(session_id) is not session_data:
+            return  # sessão deletada durante o cálculo
+        if len(df) != session_data["basic_info"]["shape"][0]:
+            # Chegaram dados novos (append) durante o cálculo - resultado já desatualizado
+            session_data["recompute_status"] = "stale"
+            return
+        
+        session_data.update({**profile, "profile_source": "full", "recompute_status": "done"})
+        
+        # Publica o resultado refinado no histórico, que o frontend já acompanha
+        if session_id in sessions_storage:
+            sessions_storage[session_id]["conversation_history"].append({
+                "type": "assistant",
+                "content": f"✅ Recálculo exato concluído com todas as {len(df)} linhas. Estatísticas atualizadas.",
+                "insights": profile["insights"],
+                "timestamp": datetime.now()
+            })
+        
+        if database is not None:
+            save_dataset_to_db(session_id, session_data)
+            if session_id in sessions_storage:
+                save_session_to_db(session_id, sessions_storage[session_id])
+        
+        logger.info(f"🎯 Perfil exato da sessão {session_id} recalculado")
+        
+    except Exception as e:
+        logger.error(f"Erro no recálculo exato: {e}")
+        session_data["recompute_status"] = "error"
+
+def start_exact_recompute(session_id: str) -> str:
+    """Agenda o recálculo exato (uma vez por vez por sessão) e retorna o status"""
+    session_data = datasets_storage[session_id]
+    if session_data.get("sample") is None:
+        return "not_needed"
+    if session_data.get("recompute_status") == "running":
+        return "running"
+    
+    session_data["recompute_status"] = "running"
+    # Guardar a referência evita que a task seja coletada antes de terminar
+    session_data["recompute_task"] = asyncio.create_task(recompute_exact_profile(session_id))
+    return "running"
+
+def _build_incremental_state(df: "pd.DataFrame", numeric_columns: List[str], categorical_columns: List[str]):
+    return IncrementalStats.from_frame(df, numeric_columns, categorical_columns), MissingnessIndex.from_frame(df)
+
+async def get_incremental_state(session_data: Dict):
+    """Estado mesclável e índice de ausentes da sessão, montados uma vez a partir dos dados atuais
+    
+    A montagem é O(linhas) e roda numa thread; o frame é juntado antes, no event loop.
+    """
+    while session_data.get("incremental_stats") is None or session_data.get("missingness_index") is None:
+        df = get_session_frame(session_data)
+        basic_info = session_data["basic_info"]
+        version = session_data.get("updated_at")
+        state, missingness_index = await asyncio.to_thread(
+            _build_incremental_state, df, basic_info["numeric_columns"], basic_info["categorical_columns"]
+        )
+        # Outro append pode ter montado o estado (e anexado um bloco) durante o cálculo
+        if session_data.get("updated_at") == version:
+            session_data.setdefault("incremental_stats", state)
+            session_data.setdefault("missingness_index", missingness_index)
+    
+    return session_data["incremental_stats"], session_data["missingness_index"]
+
+async def append_chunk_to_session(session_data: Dict, chunk: "pd.DataFrame") -> Dict:
+    """Anexa um bloco com o mesmo schema e atualiza as estatísticas incrementalmente"""
+    import pandas as pd
+    
+    basic_info = session_data["basic_info"]
+    columns = list(basic_info["columns"])
+    numeric_columns = list(basic_info["numeric_columns"])
+    categorical_columns = list(basic_info["categorical_columns"])
+    
+    if set(chunk.columns) != set(columns):
+        missing = [col for col in columns if col not in chunk.columns]
+        extra = [col for col in chunk.columns if col not in columns]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Schema diferente do dataset. Faltando: {missing or '-'}; extras: {extra or '-'}"
+        )
+    chunk = chunk[columns].copy()
+    
+    # Colunas que viraram datetime na ingestão são convertidas do mesmo jeito no bloco
+    parse_datetime_columns(chunk, [col for col in columns if basic_info["dtypes"][col].startswith("datetime64")])
+    
+    wrong_type = [col for col in numeric_columns if not pd.api.types.is_numeric_dtype(chunk[col])]
+    if wrong_type:
+        raise HTTPException(status_code=400, detail=f"Colunas numéricas com valores não numéricos: {wrong_type}")
+    
+    # Depois da montagem inicial cada bloco custa O(linhas novas)
+    state, missingness_index = await get_incremental_state(session_data)
+    state.update(chunk)
+    missingness_index = missingness_index.extended(chunk)
+    
+    # Blocos ficam pendentes até algum gráfico precisar do DataFrame completo
+    session_data.setdefault("pending_chunks", []).append(chunk)
+    
+    # Em sessões amostradas o reservatório absorve o bloco e os gráficos seguem na amostra
+    sample = session_data.get("sample")
+    if sample is not None:
+        sample.update(chunk)
+        session_data["analyzer"] = DataAnalyzer(sample.frame)
+        session_data["profile_source"] = "full"
+    
+    # Substitui (não altera) os dicionários - sessões de exemplo compartilham os do catálogo
+    basic_info = session_data["basic_info"]
+    time_columns = basic_info.get("time_columns", {})
+    basic_info = state.basic_info(basic_info["dtypes"])
+    basic_info["time_columns"] = time_columns
+    outliers_info = state.outliers_info()
+    correlation_matrix = state.correlation_matrix()
+    session_data.update({
+        "incremental_stats": state,
+        "basic_info": basic_info,
+        "descriptive_stats": state.descriptive_stats(),
+        "outliers_info": outliers_info,
+        "correlation_matrix": correlation_matrix,
+        "insights": build_insights(
+            state.n_rows, basic_info["missing_values"], outliers_info, correlation_matrix,
+            numeric_columns, categorical_columns
+        ),
+        "missingness_index": missingness_index,
+        "missingness": missingness_index.summary(),
+        "distributions": state.distributions(),
+        "categorical_associations": state.association_matrix(),
+        "updated_at": datetime.now()
+    })
+    # Análises de alvo não são incrementais - recalculadas sob demanda
+    session_data.pop("target_analyses", None)
+    
+    return session_data
+
+# Comparação entre sessões - só com os artefatos do perfil, sem reler os dados
+DRIFT_PSI_MODERATE = float(os.getenv("DRIFT_PSI_MODERATE", "0.1"))
+DRIFT_PSI_SIGNIFICANT = float(os.getenv("DRIFT_PSI_SIGNIFICANT", "0.25"))
+DRIFT_CORRELATION_DELTA = float(os.getenv("DRIFT_CORRELATION_DELTA", "0.2"))
+_PSI_EPSILON = 1e-4
+
+def _quantile_cdf(quantiles, x) -> "np.ndarray":
+    """CDF em x a partir da grade de quantis (interpolação linear entre os pontos)"""
+    import numpy as np
+    
+    q = np.asarray(quantiles, dtype=float)
+    p = np.linspace(0, 1, len(q))
+    x = np.asarray(x, dtype=float)
+    
+    # k = pontos da grade <= x; entre q[k-1] e q[k] a CDF é interpolada
+    k = np.searchsorted(q, x, side="right")
+    cdf = np.where(k >= len(q), 1.0, 0.0)
+    inside = (k > 0) & (k < len(q))
+    kk = k[inside]
+    cdf[inside] = p[kk - 1] + (x[inside] - q[kk - 1]) / (q[kk] - q[kk - 1]) * (p[kk] - p[kk - 1])
+    return cdf
+
+def _psi(base_share, other_share) -> float:
+    import numpy as np
+    
+    base_share = np.maximum(np.asarray(base_share, dtype=float), _PSI_EPSILON)
+    other_share = np.maximum(np.asarray(other_share, dtype=float), _PSI_EPSILON)
+    return float(((other_share - base_share) * np.log(other_share / base_share)).sum())
+
+def _ks_pvalue(statistic: float, n_base: int, n_other: int) -> float:
+    """p-valor assintótico do KS de duas amostras (distribuição de Kolmogorov)"""
+    import numpy as np
+    
+    n_eff = n_base * n_other / (n_base + n_other)
+    lam = (np.sqrt(n_eff) + 0.12 + 0.11 / np.sqrt(n_eff)) * statistic
+    if lam < 1e-3:
+        return 1.0
+    k = np.arange(1, 101)
+    return float(np.clip(2 * np.sum((-1) ** (k - 1) * np.exp(-2 * k ** 2 * lam ** 2)), 0.0, 1.0))
+
+def _drift_level(psi: float) -> str:
+    if psi >= DRIFT_PSI_SIGNIFICANT:
+        return "significant"
+    if psi >= DRIFT_PSI_MODERATE:
+        return "moderate"
+    return "none"
+
+def numeric_shift(base: Dict, other: Dict) -> Dict:
+    """PSI (decis da base como faixas) e KS entre duas grades de quantis"""
+    import numpy as np
+    
+    base_q, other_q = base["quantiles"], other["quantiles"]
+    n = len(base_q) - 1
+    
+    edges = np.unique(np.asarray(base_q)[[round(n * i / 10) for i in range(1, 10)]])
+    base_share = np.diff(np.concatenate([[0.0], _quantile_cdf(base_q, edges), [1.0]]))
+    other_share = np.diff(np.concatenate([[0.0], _quantile_cdf(other_q, edges), [1.0]]))
+    psi = _psi(base_share, other_share)
+    
+    points = np.union1d(base_q, other_q)
+    ks = float(np.abs(_quantile_cdf(base_q, points) - _quantile_cdf(other_q, points)).max())
+    
+    return {
+        "type": "numeric",
+        "psi": psi,
+        "ks": ks,
+        "ks_pvalue": _ks_pvalue(ks, base["count"], other["count"]),
+        "median": {"base": base_q[n // 2], "other": other_q[n // 2]},
+        "drift": _drift_level(psi)
+    }
+
+def categorical_shift(base: Dict, other: Dict) -> Dict:
+    """PSI sobre os níveis guardados (demais níveis somados em "outros")"""
+    base_counts = dict(zip(base["levels"], base["counts"]))
+    other_counts = dict(zip(other["levels"], other["counts"]))
+    levels = list(dict.fromkeys([*base["levels"], *other["levels"]]))
+    
+    base_share = [base_counts.get(level, 0) / base["count"] for level in levels] + [base["other"] / base["count"]]
+    other_share = [other_counts.get(level, 0) / other["count"] for level in levels] + [other["other"] / other["count"]]
+    psi = _psi(base_share, other_share)
+    
+    return {
+        "type": "categorical",
+        "psi": psi,
+        # Só é certo que o nível é novo/sumiu quando o outro lado guardou todos os níveis
+        "new_levels": [level for level in other["levels"] if level not in base_counts] if not base["other"] else [],
+        "missing_levels": [level for level in base["levels"] if level not in other_counts] if not other["other"] else [],
+        "drift": _drift_level(psi)
+    }
+
+def compare_profiles(base: Dict, other: Dict) -> Dict:
+    """Diferenças entre dois perfis: schema, ausentes, distribuições e correlações"""
+    import numpy as np
+    
+    base_info, other_info = base["basic_info"], other["basic_info"]
+    base_rows, other_rows = base_info["shape"][0], other_info["shape"][0]
+    base_columns, other_columns = list(base_info["columns"]), list(other_info["columns"])
+    common = [col for col in base_columns if col in set(other_columns)]
+    
+    # Schema e tipos
+    schema = {
+        "added": [col for col in other_columns if col not in set(base_columns)],
+        "removed": [col for col in base_columns if col not in set(other_columns)],
+        "dtype_changes": {
+            col: {"base": base_info["dtypes"][col], "other": other_info["dtypes"][col]}
+            for col in common if base_info["dtypes"][col] != other_info["dtypes"][col]
+        }
+    }
+    
+    # Taxas de ausentes
+    null_rates = {}
+    for col in common:
+        base_rate = base_info["missing_values"].get(col, 0) / base_rows if base_rows else 0.0
+        other_rate = other_info["missing_values"].get(col, 0) / other_rows if other_rows else 0.0
+        null_rates[col] = {"base": base_rate, "other": other_rate, "delta": other_rate - base_rate}
+    null_rates = dict(sorted(null_rates.items(), key=lambda item: -abs(item[1]["delta"])))
+    
+    # Distribuições
+    base_dist = base.get("distributions") or {}
+    other_dist = other.get("distributions") or {}
+    base_stats = (base.get("descriptive_stats") or {}).get("numeric", {})
+    other_stats = (other.get("descriptive_stats") or {}).get("numeric", {})
+    shift = {}
+    unavailable = []
+    for col in common:
+        if col in base_dist.get("numeric", {}) and col in other_dist.get("numeric", {}):
+            b, o = base_dist["numeric"][col], other_dist["numeric"][col]
+            if not b["quantiles"] or not o["quantiles"]:
+                unavailable.append(col)
+                continue
+            shift[col] = numeric_shift(b, o)
+            base_std = base_stats.get(col, {}).get("std")
+            if base_std and col in other_stats:
+                # Diferença de médias em desvios-padrão da base
+                shift[col]["mean_shift"] = _finite((other_stats[col]["mean"] - base_stats[col]["mean"]) / base_std)
+        elif col in base_dist.get("categorical", {}) and col in other_dist.get("categorical", {}):
+            b, o = base_dist["categorical"][col], other_dist["categorical"][col]
+            if not b["count"] or not o["count"]:
+                unavailable.append(col)
+                continue
+            shift[col] = categorical_shift(b, o)
+        else:
+            unavailable.append(col)
+    shift = dict(sorted(shift.items(), key=lambda item: -item[1]["psi"]))
+    
+    # Estrutura de correlação nas colunas numéricas comuns
+    base_corr = base.get("correlation_matrix") or {}
+    other_corr = other.get("correlation_matrix") or {}
+    corr_columns = [col for col in common if col in base_corr and col in other_corr]
+    pairs = []
+    for i, col_a in enumerate(corr_columns):
+        for col_b in corr_columns[i + 1:]:
+            r_base, r_other = base_corr[col_a].get(col_b), other_corr[col_a].get(col_b)
+            if r_base is None or r_other is None or np.isnan(r_base) or np.isnan(r_other):
+                continue
+            pairs.append({"columns": [col_a, col_b], "base": r_base, "other": r_other, "delta": r_other - r_base})
+    deltas = np.abs([pair["delta"] for pair in pairs]) if pairs else np.zeros(0)
+    pairs.sort(key=lambda pair: -abs(pair["delta"]))
+    correlation_changes = {
+        "pairs_compared": len(pairs),
+        "mean_abs_delta": float(deltas.mean()) if len(deltas) else 0.0,
+        "max_abs_delta": float(deltas.max()) if len(deltas) else 0.0,
+        "changed_pairs": [pair for pair in pairs if abs(pair["delta"]) >= DRIFT_CORRELATION_DELTA][:20]
+    }
+    
+    # Resumo em texto, no mesmo estilo dos insights
+    insights = []
+    if schema["added"] or schema["removed"]:
+        insights.append(f"🧱 Schema mudou: +{len(schema['added'])} / -{len(schema['removed'])} colunas")
+    if schema["dtype_changes"]:
+        insights.append(f"🔤 Tipos alterados: {', '.join(schema['dtype_changes'])}")
+    significant = [col for col, info in shift.items() if info["drift"] == "significant"]
+    moderate = [col for col, info in shift.items() if info["drift"] == "moderate"]
+    if significant:
+        insights.append(f"🚨 Drift significativo (PSI ≥ {DRIFT_PSI_SIGNIFICANT}): {', '.join(significant[:10])}")
+    if moderate:
+        insights.append(f"⚠️ Drift moderado (PSI ≥ {DRIFT_PSI_MODERATE}): {', '.join(moderate[:10])}")
+    null_changes = [col for col, info in null_rates.items() if abs(info["delta"]) >= 0.05]
+    if null_changes:
+        insights.append(f"🕳️ Taxa de ausentes mudou mais de 5 p.p.: {', '.join(null_changes[:10])}")
+    if correlation_changes["changed_pairs"]:
+        top = correlation_changes["changed_pairs"][0]
+        insights.append(
+            f"🔗 {len(correlation_changes['changed_pairs'])} pares com correlação alterada; maior: "
+            f"{top['columns'][0]} ↔ {top['columns'][1]} ({top['base']:.2f} → {top['other']:.2f})"
+        )
+    if not insights:
+        insights.append("✅ Nenhuma mudança relevante entre os perfis")
+    
+    return {
+        "rows": {"base": base_rows, "other": other_rows},
+        "schema": schema,
+        "null_rates": null_rates,
+        "distribution_shift": shift,
+        "distribution_unavailable": unavailable,
+        "correlation_changes": correlation_changes,
+        "insights": insights
+    }
+
+def get_stored_profile(session_id: str) -> Dict:
+    """Perfil da sessão em memória ou, se já saiu da memória, o salvo no MongoDB"""
+    session_data = datasets_storage.get(session_id)
+    if session_data is not None:
+        return session_data
+    
+    if database is not None:
+        try:
+            document = database.datasets.find_one({"session_id": session_id}, {"_id": 0})
+            if document is not None:
+                return document
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar perfil no MongoDB: {e}")
+    
+    raise HTTPException(status_code=404, detail=f"Sessão {session_id} não encontrada")
+
+# Catálogo de exemplos - artefatos prontos para cada CSV de sample_data
+SAMPLE_DIR = Path("sample_data")
+SAMPLE_CACHE_DIR = Path(os.getenv("SAMPLE_CACHE_DIR", "/tmp/eda_sample_cache"))
+SAMPLE_CACHE_VERSION = 2  # incrementar quando o formato do perfil mudar
+SAMPLE_INITIAL_QUESTION = "Faça uma análise inicial deste dataset, destacando pontos importantes"
+
+# filename -> entrada do catálogo (DataFrame, analisador, perfil, gráficos, resumo da IA)
+sample_catalog = {}
+_sample_catalog_lock = asyncio.Lock()
+
+def _json_default(value):
+    """Converte tipos numpy/datetime para JSON"""
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _prebuild_charts(analyzer: DataAnalyzer):
+    """Gera os gráficos que o chat costuma pedir, preenchendo o chart_cache"""
+    analyzer.create_correlation_heatmap_data()
+    for col in analyzer.numeric_columns[:3]:
+        analyzer.create_histogram_data(col)
+        analyzer.create_box_plot_data(col)
+    if len(analyzer.numeric_columns) >= 2:
+        analyzer.create_scatter_plot_data(analyzer.numeric_columns[0], analyzer.numeric_columns[1])
+
+def _sample_profile_path(stem: str, content_hash: str) -> Path:
+    """Caminho do perfil em cache de um exemplo (só JSON - o CSV é pequeno e é relido)"""
+    return SAMPLE_CACHE_DIR / f"{stem}.{content_hash}.json"
+
+def _sample_cache_dir_ok() -> bool:
+    """Cria o diretório do cache (0700) e confere o dono - /tmp é compartilhado"""
+    try:
+        SAMPLE_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        owner = SAMPLE_CACHE_DIR.stat().st_uid
+    except OSError as e:
+        logger.warning(f"⚠️ Cache de exemplos indisponível: {e}")
+        return False
+    
+    if hasattr(os, "getuid") and owner != os.getuid():
+        logger.warning(f"⚠️ {SAMPLE_CACHE_DIR} pertence a outro usuário - cache de exemplos ignorado")
+        return False
+    return True
+
+def _load_sample_artifacts(stem: str, content_hash: str) -> Optional[Dict]:
+    """Carrega o perfil do cache em disco (None se ausente/corrompido)"""
+    profile_path = _sample_profile_path(stem, content_hash)
+    if not profile_path.exists() or not _sample_cache_dir_ok():
+        return None
+    
+    try:
+        artifacts = json.loads(profile_path.read_text(encoding="utf-8"))
+        if artifacts.get("version") != SAMPLE_CACHE_VERSION:
+            return None  # perfil de uma versão anterior, sem os artefatos atuais
+        return artifacts
+    except Exception as e:
+        logger.warning(f"⚠️ Cache do exemplo {stem} inválido, reconstruindo: {e}")
+        return None
+
+def _save_sample_artifacts(stem: str, content_hash: str, artifacts: Dict):
+    """Grava o perfil no cache em disco - falhas só geram aviso"""
+    if not _sample_cache_dir_ok():
+        return
+    
+    profile_path = _sample_profile_path(stem, content_hash)
+    try:
+        # Remove artefatos de versões anteriores do mesmo arquivo
+        for stale in SAMPLE_CACHE_DIR.glob(f"{stem}.*"):
+            if stale != profile_path and stale.name.rsplit(".", 2)[0] == stem:
+                stale.unlink()
+        profile_path.write_text(
+            json.dumps({**artifacts, "version": SAMPLE_CACHE_VERSION}, default=_json_default), encoding="utf-8"
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Não consegui gravar o cache do exemplo {stem}: {e}")
+
+def _build_sample_entry(file_path: Path, stat: os.stat_result) -> Dict:
+    """Monta a entrada do catálogo, reaproveitando o cache em disco se o hash bater"""
+    contents = file_path.read_bytes()
+    content_hash = hashlib.sha256(contents).hexdigest()[:16]
+    
+    # O CSV é sempre relido (é pequeno); só o perfil, os gráficos e o resumo vêm do cache
+    df = read_csv_bytes(contents)
+    if df is None:
+        raise HTTPException(status_code=500, detail="Não consegui ler o arquivo com nenhum encoding")
+    if df.empty:
+        raise HTTPException(status_code=400, detail="Arquivo vazio")
+    parse_datetime_columns(df)
+    
+    artifacts = _load_sample_artifacts(file_path.stem, content_hash)
+    if artifacts is not None:
+        logger.info(f"📦 Exemplo {file_path.name} carregado do cache")
+    else:
+        analyzer = DataAnalyzer(df, chart_cache={})
+        _prebuild_charts(analyzer)
+        artifacts = {
+            "profile": build_dataset_profile(analyzer),
+            "charts": analyzer.chart_cache,
+            "initial_analysis": None
+        }
+        _save_sample_artifacts(file_path.stem, content_hash, artifacts)
+        logger.info(f"🏗️ Perfil do exemplo {file_path.name} construído")
+    
+    return {
+        "filename": file_path.name,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "content_hash": content_hash,
+        "dataframe": df,
+        "analyzer": DataAnalyzer(df, chart_cache=artifacts["charts"]),
+        "profile": artifacts["profile"],
+        "initial_analysis": artifacts["initial_analysis"]
+    }
+
+def _is_fresh(entry: Optional[Dict], stat: os.stat_result) -> bool:
+    """Entrada do catálogo ainda corresponde ao arquivo em disco?"""
+    return entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+async def get_sample_entry(filename: str) -> Dict:
+    """Busca o exemplo no catálogo, (re)construindo se o arquivo mudou"""
+    file_path = SAMPLE_DIR / filename
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Arquivo {filename} não encontrado")
+    
+    entry = sample_catalog.get(filename)
+    if _is_fresh(entry, stat):
+        return entry
+    
+    async with _sample_catalog_lock:
+        # Outra requisição pode ter construído enquanto esperávamos o lock
+        entry = sample_catalog.get(filename)
+        if not _is_fresh(entry, stat):
+            entry = await asyncio.to_thread(_build_sample_entry, file_path, stat)
+            sample_catalog[filename] = entry
+    
+    return entry
+
+async def get_sample_initial_analysis(entry: Dict) -> str:
+    """Resumo inicial da IA para o exemplo, gerado uma vez e cacheado"""
+    if entry["initial_analysis"] is not None:
+        return entry["initial_analysis"]
+    
+    profile = entry["profile"]
+    initial_analysis = await ask_ai(
+        SAMPLE_INITIAL_QUESTION, profile["basic_info"],
+        prompt=build_ai_prompt(SAMPLE_INITIAL_QUESTION, profile["basic_info"], session_data=profile)
+    )
+    
+    # Não cacheia erro da IA - a próxima carga tenta de novo
+    if not initial_analysis.startswith(AI_ERROR_PREFIX):
+        entry["initial_analysis"] = initial_analysis
+        _save_sample_artifacts(Path(entry["filename"]).stem, entry["content_hash"], {
+            "profile": entry["profile"],
+            "charts": entry["analyzer"].chart_cache,
+            "initial_analysis": initial_analysis
+        })
+    
+    return initial_analysis
+
+async def build_sample_catalog():
+    """Pré-constrói o catálogo de todos os exemplos (usado no deploy)"""
+    for file_path in sorted(SAMPLE_DIR.glob("*.csv")):
+        entry = await get_sample_entry(file_path.name)
+        await get_sample_initial_analysis(entry)
+    return sample_catalog
+
+# Cache HTTP - corpo serializado e comprimido uma vez por versão do artefato
+HTTP_CACHE_CONTROL = "private, no-cache"  # sessões mudam com append/recálculo: sempre revalidar
+HTTP_COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024"))
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+def _accepted_encodings(header: str) -> set:
+    """Codificações aceitas no Accept-Encoding (ignora as com q=0)"""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+def _etag_matches(if_none_match: Optional[str], etags: List[str]) -> bool:
+    """Comparação fraca do If-None-Match, como pede a RFC 9110"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in candidates for etag in etags)
+
+class CachedBody:
+    """Resposta JSON serializada uma vez, com variantes comprimidas e ETags fortes"""
+    
+    def __init__(self, payload, version):
+        self.version = version
+        
+        # Mesma serialização do JSONResponse, feita uma única vez por versão
+        body = json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        
+        # Cada representação tem sua própria ETag forte
+        self.variants = {"identity": (body, f'"{digest}"')}
+        if len(body) >= HTTP_COMPRESS_MIN_BYTES:
+            self.variants["gzip"] = (gzip.compress(body, compresslevel=6, mtime=0), f'"{digest}-gzip"')
+            if BROTLI_AVAILABLE:
+                import brotli
+                self.variants["br"] = (brotli.compress(body), f'"{digest}-br"')
+    
+    def response(self, request: Request) -> Response:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((enc for enc in ("br", "gzip") if enc in self.variants and enc in accepted), "identity")
+        body, etag = self.variants[encoding]
+        
+        headers = {"ETag": etag, "Cache-Control": HTTP_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        # Só a ETag da representação escolhida vale - a ETag gzip não valida uma resposta identity
+        if _etag_matches(request.headers.get("if-none-match"), [etag]):
+            return Response(status_code=304, headers=headers)
+        
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+def cached_json_response(request: Request, cache: Dict, key: str, version, build) -> Response:
+    """Responde a partir do corpo em cache; build() só roda quando a versão muda"""
+    entry = cache.get(key)
+    if entry is None or entry.version != version:
+        entry = CachedBody(build(), version)
+        cache[key] = entry
+    return entry.response(request)
+
+def _session_info_version(session_data: Dict) -> tuple:
+    """Versão do /info: muda com append, recálculo exato e associações recalculadas"""
+    return (
+        session_data.get("updated_at"),
+        session_data.get("recompute_status"),
+        session_data.get("profile_source"),
+        "categorical_associations" in session_data
+    )
 
 # Endpoints da API
 
@@ -513,16 +2954,16 @@ async def ask_ai(question: str, dataset_info: Dict, conversation_history: List =
 async def get_sample_files():
     """Lista arquivos CSV de exemplo"""
     try:
-        sample_dir = Path("sample_data")
-        if not sample_dir.exists():
+        if not SAMPLE_DIR.exists():
             return {"files": [], "message": "Pasta de exemplos não encontrada"}
         
         csv_files = []
-        for file_path in sample_dir.glob("*.csv"):
+        for file_path in SAMPLE_DIR.glob("*.csv"):
+            size = file_path.stat().st_size
             file_info = {
                 "filename": file_path.name,
-                "size": file_path.stat().st_size,
-                "size_mb": round(file_path.stat().st_size / (1024 * 1024), 2)
+                "size": size,
+                "size_mb": round(size / (1024 * 1024), 2)
             }
             csv_files.append(file_info)
         
@@ -533,57 +2974,23 @@ async def get_sample_files():
 
 @app.post("/api/load-sample/{filename}")
 async def load_sample_file(filename: str):
-    """Carrega um arquivo CSV de exemplo"""
+    """Carrega um arquivo CSV de exemplo (artefatos vêm do catálogo)"""
     try:
-        if not filename.endswith('.csv'):
+        if not filename.endswith('.csv') or Path(filename).name != filename:
             raise HTTPException(status_code=400, detail="Precisa ser arquivo CSV")
         
-        file_path = Path("sample_data") / filename
-        
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail=f"Arquivo {filename} não encontrado")
+        entry = await get_sample_entry(filename)
+        profile = entry["profile"]
+        basic_info = profile["basic_info"]
         
-        # Tentar diferentes codificações
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                logger.info(f"Arquivo carregado com encoding: {encoding}")
-                break
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                logger.error(f"Erro com {encoding}: {e}")
-                continue
-        
-        if df is None:
-            raise HTTPException(status_code=500, detail="Não consegui ler o arquivo com nenhum encoding")
-        
-        if df.empty:
-            raise HTTPException(status_code=400, detail="Arquivo vazio")
-        
-        # Criar sessão
+        # Criar sessão - aponta para o DataFrame e analisador compartilhados do catálogo
         session_id = str(uuid.uuid4())
         
-        # Analisar dados
-        analyzer = DataAnalyzer(df)
-        basic_info = analyzer.get_basic_info()
-        descriptive_stats = analyzer.get_descriptive_stats()
-        outliers_info = analyzer.find_outliers()
-        correlation_matrix = analyzer.get_correlations()
-        insights = analyzer.generate_insights()
-        
-        # Salvar dados da sessão
         datasets_storage[session_id] = {
-            "dataframe": df,
-            "analyzer": analyzer,
-            "basic_info": basic_info,
-            "descriptive_stats": descriptive_stats,
-            "outliers_info": outliers_info,
-            "correlation_matrix": correlation_matrix,
-            "insights": insights,
+            "dataframe": entry["dataframe"],
+            "analyzer": entry["analyzer"],
+            **profile,
+            "missingness_index": entry["analyzer"].missingness,
             "uploaded_at": datetime.now(),
             "source_file": filename
         }
@@ -599,17 +3006,13 @@ async def load_sample_file(filename: str):
             save_session_to_db(session_id, sessions_storage[session_id])
             logger.info(f"📊 Sessão {session_id} salva no MongoDB")
         
-        # Análise inicial automática
-        initial_analysis = await ask_ai(
-            "Faça uma análise inicial deste dataset, destacando pontos importantes",
-            basic_info
-        )
+        initial_analysis = await get_sample_initial_analysis(entry)
         
         return {
             "session_id": session_id,
             "basic_info": basic_info,
             "initial_analysis": initial_analysis,
-            "insights": insights,
+            "insights": profile["insights"],
             "message": f"Dataset {filename} carregado! {basic_info['shape'][0]} linhas, {basic_info['shape'][1]} colunas.",
             "source_file": filename
         }
@@ -621,29 +3024,15 @@ async def load_sample_file(filename: str):
         raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
 
 @app.post("/api/upload-csv")
-async def upload_csv(file: UploadFile = File(...)):
-    """Faz upload de arquivo CSV"""
+async def upload_csv(file: UploadFile = File(...), stratify_column: Optional[str] = None):
+    """Faz upload de arquivo CSV (stratify_column: coluna para estratificar a amostra de datasets grandes)"""
     try:
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="Só aceito CSV")
         
         # Ler arquivo
         contents = await file.read()
-        
-        # Tentar diferentes encodings
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(io.StringIO(contents.decode(encoding)))
-                logger.info(f"Upload com encoding: {encoding}")
-                break
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                logger.error(f"Erro com {encoding}: {e}")
-                continue
+        df = read_csv_bytes(contents)
         
         if df is None:
             raise HTTPException(status_code=500, detail="Não consegui ler o arquivo")
@@ -655,21 +3044,12 @@ async def upload_csv(file: UploadFile = File(...)):
         session_id = str(uuid.uuid4())
         
         # Analisar
-        analyzer = DataAnalyzer(df)
-        basic_info = analyzer.get_basic_info()
-        descriptive_stats = analyzer.get_descriptive_stats()
-        outliers_info = analyzer.find_outliers()
-        correlation_matrix = analyzer.get_correlations()
-        insights = analyzer.generate_insights()
+        session_data = build_session_data(df, stratify_column)
+        basic_info = session_data["basic_info"]
+        insights = session_data["insights"]
         
         datasets_storage[session_id] = {
-            "dataframe": df,
-            "analyzer": analyzer,
-            "basic_info": basic_info,
-            "descriptive_stats": descriptive_stats,
-            "outliers_info": outliers_info,
-            "correlation_matrix": correlation_matrix,
-            "insights": insights,
+            **session_data,
             "uploaded_at": datetime.now()
         }
         
@@ -685,9 +3065,11 @@ async def upload_csv(file: UploadFile = File(...)):
             logger.info(f"📊 Sessão {session_id} salva no MongoDB")
         
         # Análise inicial
+        question = "Analise este dataset e dê um resumo geral"
         initial_analysis = await ask_ai(
-            "Analise este dataset e dê um resumo geral",
-            basic_info
+            question,
+            basic_info,
+            prompt=build_ai_prompt(question, basic_info, session_data=datasets_storage[session_id])
         )
         
         return {
@@ -695,9 +3077,12 @@ async def upload_csv(file: UploadFile = File(...)):
             "basic_info": basic_info,
             "initial_analysis": initial_analysis,
             "insights": insights,
+            "sampling": get_sampling_info(session_data),
             "message": f"Dataset carregado! {basic_info['shape'][0]} linhas, {basic_info['shape'][1]} colunas."
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro no upload: {e}")
         raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
@@ -716,8 +3101,8 @@ async def chat_with_data(message: ChatMessage):
         session_data = datasets_storage[session_id]
         conversation_history = sessions_storage[session_id]["conversation_history"]
         
+        analyzer = get_session_analyzer(session_data)
         df = session_data["dataframe"]
-        analyzer = session_data["analyzer"]
         basic_info = session_data["basic_info"]
         
         # Adicionar mensagem ao histórico
@@ -727,8 +3112,9 @@ async def chat_with_data(message: ChatMessage):
             "timestamp": datetime.now()
         })
         
-        # Perguntar para IA
-        ai_response = await ask_ai(user_message, basic_info, conversation_history)
+        # Perguntar para IA - contexto com as estatísticas da sessão e o histórico anterior à pergunta
+        prompt = build_ai_prompt(user_message, basic_info, conversation_history[:-1], session_data)
+        ai_response = await ask_ai(user_message, basic_info, prompt=prompt)
         
         # Gerar gráficos e insights baseados na pergunta
         charts = []
@@ -748,6 +3134,46 @@ async def chat_with_data(message: ChatMessage):
                 charts.append(heatmap_data)
             insights.append("Análise de correlação disponível para colunas numéricas")
         
+        elif "associação" in message_lower or "categóric" in message_lower or "cramér" in message_lower:
+            associations = session_data.get("categorical_associations")
+            if not associations:
+                associations = analyzer.categorical.association_matrix()
+                session_data["categorical_associations"] = associations
+            cramers_v = associations["cramers_v"]
+            strong = sorted(
+                {tuple(sorted((a, b))): v for a in cramers_v for b, v in cramers_v[a].items() if a != b and v > 0.3}.items(),
+                key=lambda item: -item[1]
+            )
+            for (col_a, col_b), v in strong[:5]:
+                insights.append(f"Associação entre {col_a} e {col_b}: V de Cramér = {v:.2f}")
+            heatmap_data = analyzer.create_association_heatmap_data()
+            if heatmap_data:
+                charts.append(heatmap_data)
+        
+        elif any(word in message_lower for word in ("temporal", "série", "tendência", "ao longo do tempo", "evolução")):
+            if analyzer.time_columns:
+                time_col = next(iter(analyzer.time_columns))
+                value_columns = [col for col in analyzer.numeric_columns if col not in analyzer.time_columns]
+                # Prefere colunas citadas na pergunta
+                mentioned = [col for col in value_columns if col.lower() in message_lower]
+                for value_col in (mentioned or value_columns)[:2] or [None]:
+                    chart_data = analyzer.create_timeseries_data(time_col, value_col)
+                    if chart_data:
+                        charts.append(chart_data)
+                insights.append(f"Série temporal por {time_col} reamostrada no servidor")
+            else:
+                insights.append("Nenhuma coluna temporal detectada no dataset")
+        
+        elif any(word in message_lower for word in ("alvo", "target", "relevância", "importância", "importantes")):
+            target = session_data.get("target")
+            if target:
+                analysis = await get_target_analysis(session_data, target)
+                for row in analysis["features"][:5]:
+                    insights.append(f"#{row['rank']} {row['feature']}: informação mútua {row['mutual_information'] or 0:.3f}")
+                charts.append(create_feature_relevance_chart(analysis))
+            else:
+                insights.append(f"Defina a variável alvo em /api/session/{session_id}/target para ver a relevância das variáveis")
+        
         elif "dispersão" in message_lower or "scatter" in message_lower:
             if len(analyzer.numeric_columns) >= 2:
                 scatter_data = analyzer.create_scatter_plot_data(
@@ -783,12 +3209,20 @@ async def chat_with_data(message: ChatMessage):
                     if chart_data:
                         charts.append(chart_data)
         
+        # Recálculo exato com todos os dados (sessões amostradas)
+        if message.exact:
+            start_exact_recompute(session_id)
+        
         # Estatísticas
         statistics = {
             "outliers": session_data["outliers_info"],
             "correlations": session_data["correlation_matrix"],
-            "basic_stats": session_data["descriptive_stats"]
+            "basic_stats": session_data["descriptive_stats"],
+            "sampling": get_sampling_info(session_data),
+            "prompt": {key: prompt[key] for key in ("estimated_tokens", "budget", "sections")}
         }
+        if session_data.get("target"):
+            statistics["target"] = await get_target_analysis(session_data, session_data["target"])
         
         # Salvar resposta
         conversation_history.append({
@@ -815,27 +3249,196 @@ async def chat_with_data(message: ChatMessage):
         raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
 
 @app.get("/api/session/{session_id}/info")
-async def get_session_info(session_id: str):
-    """Pega informações da sessão"""
+async def get_session_info(session_id: str, request: Request):
+    """Pega informações da sessão (com ETag - polls repetidos recebem 304)"""
     if session_id not in datasets_storage:
         raise HTTPException(status_code=404, detail="Sessão não encontrada")
     
     session_data = datasets_storage[session_id]
+    
+    def build():
+        return {
+            "basic_info": session_data["basic_info"],
+            "descriptive_stats": session_data["descriptive_stats"],
+            "outliers_info": session_data["outliers_info"],
+            "insights": session_data["insights"],
+            "missingness": session_data.get("missingness") or get_missingness_index(session_data).summary(),
+            "categorical_associations": session_data.get("categorical_associations", {}),
+            "sampling": get_sampling_info(session_data),
+            "uploaded_at": session_data["uploaded_at"]
+        }
+    
+    return cached_json_response(
+        request, session_data.setdefault("http_cache", {}), "info", _session_info_version(session_data), build
+    )
+
+@app.post("/api/session/{session_id}/target")
+async def set_session_target(session_id: str, request: TargetRequest):
+    """Define a variável alvo da sessão e retorna a relevância de todas as features"""
+    try:
+        if session_id not in datasets_storage:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        
+        session_data = datasets_storage[session_id]
+        analysis = await get_target_analysis(session_data, request.target)
+        session_data["target"] = request.target
+        
+        return analysis
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro na análise do alvo: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
+
+@app.get("/api/session/{session_id}/target")
+async def get_session_target(session_id: str):
+    """Análise da variável alvo atual da sessão"""
+    if session_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    
+    session_data = datasets_storage[session_id]
+    if not session_data.get("target"):
+        raise HTTPException(status_code=404, detail="Nenhuma variável alvo definida")
+    
+    return await get_target_analysis(session_data, session_data["target"])
+
+@app.get("/api/session/{session_id}/timeseries")
+async def get_session_timeseries(session_id: str, time_column: Optional[str] = None,
+                                 value_column: Optional[str] = None, freq: Optional[str] = None,
+                                 window: int = TIMESERIES_ROLLING_WINDOW):
+    """Série reamostrada no servidor: count/sum/mean/quantis por intervalo e estatísticas móveis"""
+    if session_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    
+    session_data = datasets_storage[session_id]
+    analyzer = get_session_analyzer(session_data)
+    if not analyzer.time_columns:
+        raise HTTPException(status_code=400, detail="Nenhuma coluna temporal detectada no dataset")
+    
+    time_column = time_column or next(iter(analyzer.time_columns))
+    series = analyzer.resample_time_series(time_column, value_column, freq, max(window, 1))
+    
     return {
-        "basic_info": session_data["basic_info"],
-        "descriptive_stats": session_data["descriptive_stats"],
-        "outliers_info": session_data["outliers_info"],
-        "insights": session_data["insights"],
-        "uploaded_at": session_data["uploaded_at"]
+        "time_column": time_column,
+        "time_kind": analyzer.time_columns[time_column],
+        "value_column": value_column,
+        "series": series,
+        "sampling": get_sampling_info(session_data)
     }
 
+@app.get("/api/session/{session_id}/missingness")
+async def get_session_missingness(session_id: str, columns: Optional[str] = None):
+    """Padrões de ausentes; columns=a,b,c retorna as linhas completas nesse subconjunto"""
+    if session_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    
+    index = get_missingness_index(datasets_storage[session_id])
+    response = {"missingness": index.summary()}
+    
+    if columns:
+        subset = [col.strip() for col in columns.split(",") if col.strip()]
+        complete = index.complete_rows(subset)
+        response["subset"] = {
+            "columns": subset,
+            "complete_rows": complete,
+            "complete_percentage": (complete / index.n_rows) * 100 if index.n_rows else 0.0
+        }
+    
+    return response
+
+@app.get("/api/session/{session_id}/sampling")
+async def get_session_sampling(session_id: str):
+    """Status da amostragem e do recálculo exato (consultar após pedir exact=true no chat)"""
+    if session_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    
+    session_data = datasets_storage[session_id]
+    sampling = get_sampling_info(session_data)
+    response = {"sampling": sampling}
+    
+    if sampling["sampled"] and sampling["profile_source"] == "full":
+        response.update({
+            "descriptive_stats": session_data["descriptive_stats"],
+            "outliers_info": session_data["outliers_info"],
+            "insights": session_data["insights"]
+        })
+    
+    return response
+
+@app.post("/api/session/{session_id}/append")
+async def append_to_session(session_id: str, file: UploadFile = File(...)):
+    """Anexa um novo bloco CSV à sessão, atualizando estatísticas sem recalcular tudo"""
+    try:
+        if session_id not in datasets_storage:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        
+        if not file.filename.endswith('.csv'):
+            raise HTTPException(status_code=400, detail="Só aceito CSV")
+        
+        contents = await file.read()
+        chunk = read_csv_bytes(contents)
+        
+        if chunk is None:
+            raise HTTPException(status_code=500, detail="Não consegui ler o arquivo")
+        
+        if chunk.empty:
+            raise HTTPException(status_code=400, detail="Arquivo vazio")
+        
+        session_data = datasets_storage[session_id]
+        await append_chunk_to_session(session_data, chunk)
+        basic_info = session_data["basic_info"]
+        
+        # Salvar no MongoDB se disponível
+        if database is not None:
+            save_dataset_to_db(session_id, session_data)
+        
+        return {
+            "session_id": session_id,
+            "rows_appended": len(chunk),
+            "basic_info": basic_info,
+            "insights": session_data["insights"],
+            "message": f"{len(chunk)} linhas anexadas! Total: {basic_info['shape'][0]} linhas."
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao anexar dados: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
+
+@app.get("/api/compare")
+async def compare_sessions(base: str, other: str):
+    """Compara os perfis de duas sessões (drift, schema, ausentes e correlações)"""
+    try:
+        base_profile = get_stored_profile(base)
+        other_profile = get_stored_profile(other)
+        
+        return {
+            "base": base,
+            "other": other,
+            **compare_profiles(base_profile, other_profile)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro na comparação: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
+
 @app.get("/api/session/{session_id}/history")
-async def get_conversation_history(session_id: str):
-    """Pega histórico da conversa"""
+async def get_conversation_history(session_id: str, request: Request):
+    """Pega histórico da conversa (ETag muda a cada nova mensagem)"""
     if session_id not in sessions_storage:
         raise HTTPException(status_code=404, detail="Sessão não encontrada")
     
-    return sessions_storage[session_id]["conversation_history"]
+    session = sessions_storage[session_id]
+    history = session["conversation_history"]
+    
+    # O histórico só cresce - o número de mensagens identifica a versão
+    return cached_json_response(
+        request, session.setdefault("http_cache", {}), "history", len(history), lambda: history
+    )
 
 @app.delete("/api/session/{session_id}")
 async def delete_session(session_id: str):
@@ -847,6 +3450,58 @@ async def delete_session(session_id: str):
     
     return {"message": "Sessão deletada"}
 
+def _get_profile_dir(profile_id: str, admin_token: Optional[str]) -> Path:
+    """Valida token e id do profiling, retornando o diretório do relatório"""
+    if not _is_admin(admin_token):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido")
+
+    # Ids são uuid4 em hex - evita path traversal
+    if len(profile_id) != 32 or any(c not in "0123456789abcdef" for c in profile_id):
+        raise HTTPException(status_code=400, detail="Id de profiling inválido")
+
+    report_dir = PROFILE_DIR / profile_id
+    if not report_dir.is_dir():
+        raise HTTPException(status_code=404, detail="Profiling não encontrado")
+    return report_dir
+
+@app.get("/api/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Lista os relatórios de profiling salvos"""
+    if not _is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido")
+
+    if not PROFILE_DIR.exists():
+        return {"profiles": [], "count": 0}
+
+    profiles = []
+    for summary_file in PROFILE_DIR.glob("*/summary.json"):
+        summary = json.loads(summary_file.read_text(encoding="utf-8"))
+        profiles.append({
+            key: summary.get(key)
+            for key in ("profile_id", "path", "status_code", "duration_ms", "memory_peak_mb", "created_at")
+        })
+    profiles.sort(key=lambda p: p["created_at"] or "", reverse=True)
+
+    return {"profiles": profiles, "count": len(profiles)}
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Retorna o resumo de um profiling (tempo, amostras, funções mais custosas)"""
+    report_dir = _get_profile_dir(profile_id, x_admin_token)
+    return json.loads((report_dir / "summary.json").read_text(encoding="utf-8"))
+
+@app.get("/api/admin/profiles/{profile_id}/flamegraph", response_class=PlainTextResponse)
+async def get_profile_flamegraph(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Pilhas no formato folded (usar com flamegraph.pl ou speedscope.app)"""
+    report_dir = _get_profile_dir(profile_id, x_admin_token)
+    return (report_dir / "stacks.folded").read_text(encoding="utf-8")
+
+@app.get("/api/admin/profiles/{profile_id}/memory", response_class=PlainTextResponse)
+async def get_profile_memory(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Relatório de alocações do tracemalloc"""
+    report_dir = _get_profile_dir(profile_id, x_admin_token)
+    return (report_dir / "memory.txt").read_text(encoding="utf-8")
+
 @app.get("/api/health")
 async def health_check():
     """Verifica se a API está funcionando"""
@@ -895,6 +3550,11 @@ async def root():
             "/api/sample-files - Listar exemplos",
             "/api/chat - Conversar com dados",
             "/api/session/{session_id}/info - Info da sessão",
+            "/api/session/{session_id}/append - Anexar dados à sessão",
+            "/api/session/{session_id}/missingness - Padrões de valores ausentes",
+            "/api/session/{session_id}/timeseries - Série temporal reamostrada",
+            "/api/session/{session_id}/target - Análise da variável alvo",
+            "/api/compare?base={id}&other={id} - Compara os perfis de duas sessões",
             "/docs - Documentação completa"
         ]
     }
@@ -0,0 +1,23 @@
+"""
+Cria os índices do MongoDB fora do cold start da API.
+Executar uma vez por deploy (ou quando o banco for recriado):
+
+    USE_MONGODB=true python api/setup-mongodb.py
+"""
+
+import sys
+
+from index import init_mongodb, create_mongodb_indexes
+
+print("🔌 Conectando ao MongoDB para criar índices...")
+print("=" * 50)
+
+if not init_mongodb():
+    print("❌ Não foi possível conectar. Verifique USE_MONGODB e MONGO_URL no .env")
+    sys.exit(1)
+
+if create_mongodb_indexes():
+    print("🎉 Índices criados com sucesso!")
+else:
+    print("❌ Falha ao criar índices")
+    sys.exit(1)
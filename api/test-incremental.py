@@ -0,0 +1,266 @@
+"""
+Verificação das estatísticas incrementais e derivadas contra o cálculo completo com pandas:
+
+- /append (momentos e co-momentos mesclados, QuantileSketch, correlações pareadas,
+  ausentes e associações categóricas) contra build_dataset_profile nos dados concatenados
+- coluna categórica de alta cardinalidade (IDs) no /append, com memória limitada
+- quantis das séries temporais reamostradas contra resample/groupby do pandas
+- PSI e KS da comparação entre sessões contra os valores exatos dos dados brutos
+
+    python api/test-incremental.py
+
+Sai com código 1 se alguma verificação falhar.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+import index
+
+failures = []
+
+
+def check(name, ok, detail=""):
+    print(f"{'✅' if ok else '❌'} {name}" + (f" - {detail}" if detail else ""))
+    if not ok:
+        failures.append(name)
+
+
+def close(a, b, rtol=1e-9, atol=1e-9):
+    """Igualdade recursiva de dicts/listas com tolerância nos floats (NaN == NaN)"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(close(a[k], b[k], rtol, atol) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(close(x, y, rtol, atol) for x, y in zip(a, b))
+    if isinstance(a, (float, np.floating)) or isinstance(b, (float, np.floating)):
+        if a is None or b is None:
+            return a is b
+        if math.isnan(a) or math.isnan(b):
+            return math.isnan(a) and math.isnan(b)
+        return math.isclose(a, b, rel_tol=rtol, abs_tol=atol)
+    return a == b
+
+
+def make_frame(n, rng, shift=0.0):
+    x = rng.normal(shift, 1.0, n)
+    df = pd.DataFrame({
+        "x": x,
+        "y": 0.6 * x + rng.normal(0, 0.8, n),
+        "z": rng.exponential(2.0, n),
+        "grupo": rng.choice(["a", "b", "c"], n, p=[0.5, 0.3, 0.2]),
+        "canal": rng.choice(["web", "app", "loja", "tel"], n),
+    })
+    # Ausentes em posições diferentes: correlações usam só os pares válidos
+    df.loc[rng.random(n) < 0.05, "y"] = np.nan
+    df.loc[rng.random(n) < 0.02, "z"] = np.nan
+    df.loc[rng.random(n) < 0.03, "canal"] = np.nan
+    return df
+
+
+def append_all(df, chunks):
+    session_data = index.build_session_data(df.copy())
+    for chunk in chunks:
+        asyncio.run(index.append_chunk_to_session(session_data, chunk.copy()))
+    return session_data
+
+
+def check_append(label, base_rows, chunk_rows, n_chunks, seed):
+    rng = np.random.default_rng(seed)
+    base = make_frame(base_rows, rng)
+    chunks = [make_frame(chunk_rows, rng, shift=0.2 * (i + 1)) for i in range(n_chunks)]
+    session_data = append_all(base, chunks)
+    full_df = pd.concat([base, *chunks], ignore_index=True)
+    full = index.build_dataset_profile(index.DataAnalyzer(full_df))
+
+    exact_sketches = len(full_df) <= index.QUANTILE_SKETCH_SIZE
+    print(f"\n📦 {label}: {base_rows} + {n_chunks}x{chunk_rows} linhas "
+          f"({'quantis exatos' if exact_sketches else 'quantis aproximados'})")
+
+    info, full_info = session_data["basic_info"], full["basic_info"]
+    check("shape e ausentes por coluna", tuple(info["shape"]) == tuple(full_info["shape"])
+          and info["missing_values"] == {k: int(v) for k, v in full_info["missing_values"].items()})
+
+    numeric, full_numeric = session_data["descriptive_stats"]["numeric"], full["descriptive_stats"]["numeric"]
+    moments = ["count", "mean", "std", "min", "max"]
+    check("count/média/desvio/mín/máx (mescla de Chan)", all(
+        close([numeric[col][m] for m in moments], [full_numeric[col][m] for m in moments])
+        for col in full_numeric
+    ))
+    check("correlações com pares válidos (co-momentos)",
+          close(session_data["correlation_matrix"], full["correlation_matrix"]))
+
+    # Quantis: exatos enquanto o sketch não comprime; depois, erro de posto pequeno
+    if exact_sketches:
+        check("quartis do QuantileSketch", all(
+            close([numeric[col][q] for q in ("25%", "50%", "75%")],
+                  [full_numeric[col][q] for q in ("25%", "50%", "75%")])
+            for col in full_numeric
+        ))
+        check("outliers (IQR)", close(
+            {col: v["count"] for col, v in session_data["outliers_info"].items()},
+            {col: v["count"] for col, v in full["outliers_info"].items()}
+        ))
+    else:
+        rank_errors = []
+        for col in full_numeric:
+            values = full_df[col].dropna().to_numpy()
+            for q, key in ((0.25, "25%"), (0.5, "50%"), (0.75, "75%")):
+                rank_errors.append(abs(np.mean(values <= numeric[col][key]) - q))
+        check("quartis do QuantileSketch (erro de posto < 1%)", max(rank_errors) < 0.01,
+              f"maior erro {max(rank_errors):.4%}")
+        outlier_errors = [
+            abs(session_data["outliers_info"][col]["count"] - full["outliers_info"][col]["count"]) / len(full_df)
+            for col in full_numeric
+        ]
+        check("outliers (IQR) até 0,5% das linhas", max(outlier_errors) < 0.005,
+              f"maior diferença {max(outlier_errors):.4%}")
+
+    check("estatísticas categóricas", close(
+        session_data["descriptive_stats"]["categorical"], full["descriptive_stats"]["categorical"]
+    ))
+    check("ausentes (contagens, co-ausência, padrões)", session_data["missingness"] == full["missingness"])
+    check("associações categóricas (qui-quadrado/V de Cramér)",
+          close(session_data["categorical_associations"], full["categorical_associations"]))
+    check("distribuições categóricas", session_data["distributions"]["categorical"] == full["distributions"]["categorical"])
+    check("insights", session_data["insights"] == full["insights"])
+
+
+def check_high_cardinality():
+    print("\n🆔 Categórica de alta cardinalidade (IDs) no /append")
+    rng = np.random.default_rng(7)
+    n = 40000
+
+    def frame(offset):
+        return pd.DataFrame({
+            "id": [f"u{offset + i}" for i in range(n)],
+            "pedido": [f"p{offset + i}" for i in range(n)],
+            "grupo": rng.choice(["a", "b", "c"], n),
+            "canal": rng.choice(["web", "app"], n),
+            "valor": rng.normal(size=n),
+        })
+
+    base, chunk = frame(0), frame(n)
+    session_data = index.build_session_data(base.copy())
+
+    tracemalloc.start()
+    asyncio.run(index.append_chunk_to_session(session_data, chunk.copy()))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    full = index.DataAnalyzer(pd.concat([base, chunk], ignore_index=True)).categorical.association_matrix()
+    assoc = session_data["categorical_associations"]
+    check("colunas de IDs fora da matriz", assoc["skipped_columns"] == full["skipped_columns"] == ["id", "pedido"],
+          f"{assoc['skipped_columns']}")
+    check("associações das demais colunas", close(assoc, full))
+    # Sem o corte, a tabela id x pedido teria 80k x 80k contagens (dezenas de GB)
+    check("pico de memória do append < 64 MB", peak < 64 * 1024 ** 2, f"{peak / 1024 ** 2:.1f} MB")
+
+
+def check_resample_quantiles():
+    print("\n⏱️ Quantis da série reamostrada vs pandas")
+    rng = np.random.default_rng(3)
+    n = 20000
+    times = pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(rng.uniform(0, 3 * 86400, n)), unit="s"))
+    values = rng.gamma(2.0, 10.0, n)
+    values[rng.random(n) < 0.05] = np.nan
+
+    # Linhas embaralhadas: o índice precisa ordenar pelo tempo
+    order = rng.permutation(n)
+    times, values = times.iloc[order].reset_index(drop=True), values[order]
+
+    result = index.TimeSeriesIndex(times, "datetime").resample(values, freq="1h")
+    grouped = pd.Series(values, index=pd.DatetimeIndex(times)).sort_index().resample("1h")
+    check("baldes e contagens (datetime)", result["count"] == grouped.size().tolist())
+    check("média e soma (datetime)", close(result["mean"], grouped.mean().tolist())
+          and close(result["sum"], grouped.sum().tolist()))
+    check("p25/p50/p75 (datetime)", all(
+        close(result[key], grouped.quantile(q).tolist()) for q, key in ((0.25, "p25"), (0.5, "p50"), (0.75, "p75"))
+    ))
+
+    # Coluna de segundos (Time): baldes de 15 minutos via groupby
+    seconds = pd.Series(rng.uniform(0, 172800, n))
+    result = index.TimeSeriesIndex(seconds, "offset").resample(values, freq="15min")
+    buckets = np.floor(seconds / 900).astype(int)
+    grouped = pd.Series(values).groupby(buckets)
+    full_range = range(buckets.min(), buckets.max() + 1)
+    check("p25/p50/p75 (offset)", all(
+        close(result[key], grouped.quantile(q).reindex(full_range).tolist())
+        for q, key in ((0.25, "p25"), (0.5, "p50"), (0.75, "p75"))
+    ) and result["count"] == grouped.size().reindex(full_range, fill_value=0).tolist())
+
+
+def exact_numeric_shift(base, other):
+    """PSI nos decis da base e KS das ECDFs, direto dos dados brutos"""
+    base, other = np.sort(base), np.sort(other)
+    edges = np.unique(np.quantile(base, np.arange(1, 10) / 10))
+    base_share = np.diff(np.concatenate([[0], np.searchsorted(base, edges, side="right"), [len(base)]])) / len(base)
+    other_share = np.diff(np.concatenate([[0], np.searchsorted(other, edges, side="right"), [len(other)]])) / len(other)
+    points = np.concatenate([base, other])
+    ks = np.abs(np.searchsorted(base, points, side="right") / len(base)
+                - np.searchsorted(other, points, side="right") / len(other)).max()
+    return index._psi(base_share, other_share), float(ks)
+
+
+def check_drift():
+    print("\n📉 PSI e KS da comparação entre sessões vs dados brutos")
+    rng = np.random.default_rng(11)
+    cases = {
+        "sem drift": (rng.normal(0, 1, 50000), rng.normal(0, 1, 60000)),
+        "deslocamento": (rng.normal(0, 1, 50000), rng.normal(0.3, 1.2, 60000)),
+        "cauda pesada": (rng.exponential(1.0, 50000), rng.exponential(1.5, 60000)),
+    }
+    for name, (base, other) in cases.items():
+        base_dist = index.DataAnalyzer(pd.DataFrame({"v": base})).get_distributions()["numeric"]["v"]
+        other_dist = index.DataAnalyzer(pd.DataFrame({"v": other})).get_distributions()["numeric"]["v"]
+        shift = index.numeric_shift(base_dist, other_dist)
+        psi, ks = exact_numeric_shift(base, other)
+        check(f"{name}: PSI e KS", abs(shift["psi"] - psi) <= 0.01 + 0.05 * psi and abs(shift["ks"] - ks) <= 0.01,
+              f"PSI {shift['psi']:.4f} vs {psi:.4f}, KS {shift['ks']:.4f} vs {ks:.4f}")
+
+    try:
+        from scipy import stats
+    except ImportError:
+        print("⏭️ scipy não instalado - p-valor do KS não verificado")
+    else:
+        base, other = cases["deslocamento"][0][:300], cases["deslocamento"][1][:400]
+        statistic = stats.ks_2samp(base, other).statistic
+        reference = stats.ks_2samp(base, other, method="asymp").pvalue
+        pvalue = index._ks_pvalue(statistic, len(base), len(other))
+        check("p-valor do KS (assintótico)", abs(pvalue - reference) < 0.01, f"{pvalue:.4f} vs {reference:.4f}")
+
+    base = pd.Series(rng.choice(["a", "b", "c", "d"], 30000, p=[0.4, 0.3, 0.2, 0.1]))
+    other = pd.Series(rng.choice(["a", "b", "c", "e"], 20000, p=[0.25, 0.25, 0.25, 0.25]))
+    shift = index.categorical_shift(
+        index.DataAnalyzer(pd.DataFrame({"c": base})).get_distributions()["categorical"]["c"],
+        index.DataAnalyzer(pd.DataFrame({"c": other})).get_distributions()["categorical"]["c"],
+    )
+    levels = ["a", "b", "c", "d", "e"]
+    psi = index._psi(base.value_counts(normalize=True).reindex(levels, fill_value=0),
+                     other.value_counts(normalize=True).reindex(levels, fill_value=0))
+    check("categórica: PSI exato, níveis novos e sumidos", math.isclose(shift["psi"], psi, rel_tol=1e-9)
+          and shift["new_levels"] == ["e"] and shift["missing_levels"] == ["d"], f"PSI {shift['psi']:.4f}")
+
+
+print("🔍 Verificando estatísticas incrementais...")
+print("=" * 50)
+
+check_append("Poucas linhas", 800, 300, 3, seed=1)
+check_append("Muitas linhas", 120000, 20000, 3, seed=2)
+check_high_cardinality()
+check_resample_quantiles()
+check_drift()
+
+print("=" * 50)
+
+if failures:
+    print(f"❌ {len(failures)} verificações falharam: {', '.join(failures)}")
+    sys.exit(1)
+print("🎉 Estatísticas incrementais conferem com o cálculo completo!")
@@ -106,7 +106,7 @@ const ChartDisplay = ({ chart }) => {
       <h4 className="text-sm font-medium text-gray-700 mb-2">{chart.title}</h4>
       <div className="bg-white p-4 rounded-lg shadow-sm border">
         <Plot
-          data={[chart.data]}
+          data={Array.isArray(chart.data) ? chart.data : [chart.data]}
           layout={{
             ...chart.layout,
             autosize: true,